@@ -1,161 +1,147 @@
 from flask import Flask, render_template, request, session, redirect, url_for, flash
-from sqlalchemy import select
-from unicodedata import category
-from settings import DatabaseConfig, Session
-from flask_login import LoginManager
-from models import User, Menu, SiteSettings, Order
-from routes import auth, admin, orders
+from settings import DatabaseConfig, env_bool
+from flask_login import LoginManager, current_user
+from routes import auth, admin, api, metrics, orders, reservations
 from flask_wtf.csrf import CSRFProtect
-from translations import translations
+import i18n
+from i18n import gettext as t
+from services.cart import get_cart
+from services.images import MAX_IMAGE_BYTES, image_url, image_variants
+from services.catalog import get_catalog
+from services.menu_search import ensure_index
+from services.instrumentation import init_instrumentation
+from services.kitchen import kitchen_queue
+from services.metrics import init_metrics
+from services.page_cache import cached_error_page, cached_page, init_page_cache
+from services.site_settings import get_site_images
+from services.static_assets import init_static_assets
+from services.user_cache import get_cached_user
 import os
 
-app = Flask(__name__)
-app.config.from_object(DatabaseConfig)
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'default-secret-key-for-development')
-app.config['SESSION_TYPE'] = 'filesystem'
-app.config['PERMANENT_SESSION_LIFETIME'] = 3600
-app.config['REMEMBER_COOKIE_DURATION'] = 3600
-
 login_manager = LoginManager()
 login_manager.login_view = "auth.login"
-login_manager.init_app(app)
 login_manager.session_protection = "strong"
 login_manager.remember_cookie_duration = 3600
 
-csrf = CSRFProtect(app)
+csrf = CSRFProtect()
+
 
 @login_manager.user_loader
 def load_user(user_id):
-    user = User.get(user_id)
-    return user
+    return get_cached_user(user_id)
 
-@login_manager.user_loader
-def load_user_from_session(user_id):
-    try:
-        return User.get(int(user_id))
-    except:
-        return None
 
-@app.context_processor
 def inject_logo():
-    images = get_background_settings()
+    images = get_site_images()
     return dict(mini_logo_image=images.get('mini_logo_image'))
 
-# Функция для получения перевода
-def t(key, lang='uk'):
-    return translations.get(lang, {}).get(key, key)
+
+def inject_cart():
+    if not current_user.is_authenticated:
+        return {}
+    return dict(cart_summary=get_cart(current_user.id))
 
 
 # Маршрут для смены языка
-@app.route("/set_language/<language>")
 def set_language(language):
-    if language in ['uk', 'en']:
+    if language in i18n.LANGUAGES:
         session['language'] = language
-        current_lang = session.get('language', 'uk')
-        flash(f"{t('Мову змінено на', current_lang)} {language.upper()}", 'success')
+        flash(f"{t('Мову змінено на', language)} {language.upper()}", 'success')
     return redirect(request.referrer or url_for('index'))
 
 
-@app.route("/")
+@cached_page
 def index():
-    images = get_background_settings()
-    current_lang = session.get('language', 'uk')
+    images = get_site_images()
     return render_template("index.html",
                         background_image=images.get('main_background_image'),
-                        logo_image=images.get('logo_image'),
-                        t=lambda key: t(key, current_lang),
-                        lang=current_lang)
-
-
-@app.route("/admin/dashboard")
-def dashboard():
-    images = get_background_settings()
-    current_lang = session.get('language', 'uk')
-    with Session() as db_session:
-
-        total_orders = db_session.query(Order).count()
-        
-
-        pending_orders = db_session.query(Order).filter(Order.status == 'PENDING').count()
-
-        active_menu_items = db_session.query(Menu).filter_by(active=True).count()
-    return render_template("admin/dashboard.html",
-                           background_image=images.get('admin_panel_background_image'),
-                           total_orders=total_orders,
-                           pending_orders=pending_orders,
-                           active_menu_items=active_menu_items,
-                           t=lambda key: t(key, current_lang),
-                           lang=current_lang)
-
-# Отримуємо унікальні категорії з активних елементів меню
-@app.route("/menu")
-def menu():
-    images = get_background_settings()
-    current_lang = session.get('language', 'uk')
-    with Session() as db_session:
-        stmt = select(Menu).where(Menu.active == True)
-        result = db_session.execute(stmt)
-        menu_items = result.scalars().all()
-        categories = sorted(list(set(item.category for item in menu_items if item.category)))
-    return render_template("menu.html",
-                           menu_items=menu_items,
-                           categories=categories,
-                           background_image=images.get('menu_background_image'),
-                           t=lambda key: t(key, current_lang),
-                           lang=current_lang)
-
-# Отримання фонових зображень
-def get_background_settings():
-    """Отримує налаштування фонових зображень з бази даних"""
-    backgrounds = {}
-    with Session() as session:
-        settings = session.query(SiteSettings).filter(
-            SiteSettings.setting_name.in_([
-                'main_background_image',
-                'menu_background_image', 
-                'admin_panel_background_image',
-                'cart_background_image',
-                'order_history_background_image',
-                'logo_image',
-                'mini_logo_image'
-            ])
-        ).all()
-        for setting in settings:
-            backgrounds[setting.setting_name] = setting.setting_value
-    return backgrounds
-
-app.register_blueprint(auth.bp, url_prefix="/auth")
-app.register_blueprint(admin.bp)
-app.register_blueprint(orders.bp)
+                        logo_image=images.get('logo_image'))
+
 
 # Обробники помилок
-@app.errorhandler(404)
+@cached_error_page
 def not_found_error(error):
-    current_lang = session.get('language', 'uk')
-    return render_template('errors/404.html',
-                         t=lambda key: t(key, current_lang),
-                         lang=current_lang), 404
+    return render_template('errors/404.html'), 404
 
-@app.errorhandler(403)
+@cached_error_page
 def forbidden_error(error):
-    current_lang = session.get('language', 'uk')
-    return render_template('errors/403.html',
-                         t=lambda key: t(key, current_lang),
-                         lang=current_lang), 403
+    return render_template('errors/403.html'), 403
 
-@app.errorhandler(401)
+@cached_error_page
 def unauthorized_error(error):
-    current_lang = session.get('language', 'uk')
-    return render_template('errors/401.html',
-                         t=lambda key: t(key, current_lang),
-                         lang=current_lang), 401
+    return render_template('errors/401.html'), 401
 
-@app.errorhandler(500)
+@cached_error_page
 def internal_error(error):
-    current_lang = session.get('language', 'uk')
-    return render_template('errors/500.html',
-                         t=lambda key: t(key, current_lang),
-                         lang=current_lang), 500
+    return render_template('errors/500.html'), 500
+
+
+def create_app(test_config=None):
+    """Створює застосунок; налаштування беруться з DatabaseConfig, змінних FLASK_* та test_config"""
+    app = Flask(__name__)
+    app.config.from_object(DatabaseConfig)
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'default-secret-key-for-development')
+    app.config['SESSION_TYPE'] = 'filesystem'
+    app.config['PERMANENT_SESSION_LIFETIME'] = 3600
+    app.config['REMEMBER_COOKIE_DURATION'] = 3600
+    app.config['WARM_UP'] = env_bool('APP_WARM_UP', False)
+    app.config['TEMPLATE_CACHE_DIR'] = os.getenv('TEMPLATE_CACHE_DIR', '')
+    app.config['REQUEST_METRICS'] = env_bool('REQUEST_METRICS', True)
+    app.config['METRICS_ENABLED'] = env_bool('METRICS_ENABLED', True)
+    app.config['STATIC_ASSETS'] = env_bool('STATIC_ASSETS', True)
+    # Запас на решту полів форми поверх найбільшого зображення
+    app.config['MAX_CONTENT_LENGTH'] = MAX_IMAGE_BYTES + 1024 * 1024
+    app.config.from_prefixed_env()
+    if test_config:
+        app.config.update(test_config)
+
+    # Середовище Jinja з кешем шаблонів на кожну мову — до CSRFProtect, який його створює
+    i18n.init_app(app)
+
+    # Першим, щоб у вимір потрапили й хуки інших розширень
+    init_instrumentation(app)
+    init_metrics(app)
+    login_manager.init_app(app)
+    csrf.init_app(app)
+    init_page_cache(app)
+    init_static_assets(app)
+
+    app.jinja_env.globals.update(image_variants=image_variants, image_url=image_url)
+    app.context_processor(inject_logo)
+    app.context_processor(inject_cart)
+
+    app.add_url_rule("/set_language/<language>", view_func=set_language)
+    app.add_url_rule("/", view_func=index)
+
+    app.register_blueprint(auth.bp, url_prefix="/auth")
+    app.register_blueprint(admin.bp)
+    app.register_blueprint(orders.bp)
+    app.register_blueprint(reservations.bp)
+    app.register_blueprint(api.bp)
+    app.register_blueprint(metrics.bp)
+
+    app.register_error_handler(404, not_found_error)
+    app.register_error_handler(403, forbidden_error)
+    app.register_error_handler(401, unauthorized_error)
+    app.register_error_handler(500, internal_error)
+
+    if app.config['WARM_UP']:
+        warm_up(app)
+    return app
+
+
+# Публічні сторінки, які першими отримують трафік після перезапуску воркера
+WARM_UP_TEMPLATES = ("base.html", "index.html", "menu.html", "auth/login.html", "errors/404.html")
+
+
+def warm_up(app):
+    """Компілює шаблони та заповнює кеші до першого запиту воркера"""
+    i18n.compile_templates(app, WARM_UP_TEMPLATES)
+    get_site_images()
+    get_catalog()
+    ensure_index()
+    kitchen_queue.rebuild()
+
 
 if __name__ == "__main__":
-    app.run(debug=True, port=5050)
\ No newline at end of file
+    create_app().run(debug=True, port=5050)
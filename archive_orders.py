@@ -0,0 +1,37 @@
+"""Переносить завершені замовлення, старші за задану кількість днів, в архів.
+
+Запускається за розкладом, наприклад щоночі з cron:
+
+    0 4 * * * cd /srv/restaurant && python3 archive_orders.py
+
+    python3 archive_orders.py [--days 90] [--batch-size 1000] [--dry-run]
+"""
+import argparse
+
+from services.archive import (ORDER_ARCHIVE_AFTER_DAYS, ORDER_ARCHIVE_BATCH_SIZE, archive_closed_orders,
+                              count_archivable, default_cutoff)
+from settings import Session
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Архівація завершених замовлень")
+    parser.add_argument("--days", type=int, default=ORDER_ARCHIVE_AFTER_DAYS,
+                        help="архівувати замовлення, старші за стільки днів")
+    parser.add_argument("--batch-size", type=int, default=ORDER_ARCHIVE_BATCH_SIZE,
+                        help="замовлень в одній транзакції")
+    parser.add_argument("--dry-run", action="store_true", help="лише порахувати, що буде перенесено")
+    args = parser.parse_args()
+
+    cutoff = default_cutoff(args.days)
+    if args.dry_run:
+        with Session() as db_session:
+            print(f"До архівації (створені до {cutoff:%d.%m.%Y %H:%M}): {count_archivable(db_session, cutoff)}")
+        return
+
+    total = archive_closed_orders(cutoff, args.batch_size,
+                                  on_batch=lambda moved, total: print(f"  перенесено {moved}, всього {total}"))
+    print(f"Архівовано замовлень: {total}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""Навантажувальний бенчмарк шляху клієнта через тестовий клієнт Flask.
+
+Створює тимчасову базу SQLite з детермінованими даними, проганяє
+сценарії (анонімний перегляд, замовлення клієнтом, дошка замовлень
+адміністратора) і рахує для кожного кроку пропускну здатність,
+p50/p95/p99 та кількість SQL-запитів. Результат порівнюється з
+збереженою базовою лінією; регресія — більше SQL-запитів на крок або
+p95, гірший за допуск. Мережа не потрібна, тож скрипт працює в CI.
+
+    python3 benchmarks/load.py
+    python3 benchmarks/load.py --iterations 50 --save-baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+PASSWORD = "BenchPassword123!"
+CATEGORIES = ("Роли", "Суші", "Сети", "Супи", "Гарячі страви", "Напої", "Десерти")
+STATUS_MIX = (
+    ("COMPLETED", 68), ("CANCELLED", 8), ("DELIVERING", 3), ("READY", 4),
+    ("PREPARING", 7), ("CONFIRMED", 10),
+)
+
+
+# Кеші з часом життя фіксуються довшими за прогін: інакше записи спливають
+# залежно від швидкості машини, і кількість SQL-запитів на крок плаває.
+# Скидаються вони лише діями сценаріїв, як і в роботі.
+PINNED_CACHE_TTLS = {
+    name: "3600" for name in (
+        "USER_CACHE_TTL", "CART_CACHE_TTL", "DASHBOARD_CACHE_TTL", "DASHBOARD_ARCHIVE_CACHE_TTL",
+        "MENU_CACHE_TTL", "SETTINGS_CACHE_TTL", "RESERVATION_INDEX_TTL", "PAGE_CACHE_TIMEOUT",
+    )
+}
+
+
+def configure_environment(workdir):
+    """Налаштування читаються під час імпорту, тому задаються до імпорту застосунку"""
+    os.environ.update(
+        DATABASE_NAME=os.path.join(workdir, "bench"),
+        DB_PROFILE="sqlite",
+        METRICS_DB=os.path.join(workdir, "metrics.db"),
+        PAGE_CACHE_BACKEND="simple",
+        SLOW_REQUEST_MS="1e9",
+        APP_WARM_UP="0",
+        TEMPLATE_CACHE_DIR="",
+        **PINNED_CACHE_TTLS,
+    )
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+
+def seed_database(rng, users, menu_items, history):
+    from sqlalchemy import insert
+    from werkzeug.security import generate_password_hash
+
+    from migrate_db import upgrade
+    from models import Menu, Order, OrderHeader, OrderStatus, SiteSettings, User
+    from services.site_settings import IMAGE_SETTINGS
+    from settings import get_engine
+
+    upgrade()
+    # Один хеш на всіх: хешування пароля повільне і не є предметом вимірювання
+    password_hash = generate_password_hash(PASSWORD)
+    now = datetime.now()
+    statuses = [OrderStatus[name] for name, _ in STATUS_MIX]
+    weights = [weight for _, weight in STATUS_MIX]
+
+    with get_engine().begin() as connection:
+        connection.execute(insert(User), [
+            {"username": "bench_admin", "email": "bench_admin@example.com",
+             "hash_password": password_hash, "is_admin": True},
+            *({"username": f"bench_user_{index}", "email": f"bench_user_{index}@example.com",
+               "hash_password": password_hash, "is_admin": False} for index in range(users)),
+        ])
+        connection.execute(insert(SiteSettings), [
+            {"setting_name": name, "setting_value": f"/static/images/{name}.jpg"} for name in IMAGE_SETTINGS
+        ])
+        connection.execute(insert(Menu), [
+            {"name": f"Страва {index}", "price": rng.randrange(80, 900, 10),
+             "rating": rng.randint(3, 5), "description": f"Опис страви {index} з лососем і рисом",
+             "image_path": "", "category": CATEGORIES[index % len(CATEGORIES)], "active": True}
+            for index in range(menu_items)
+        ])
+
+        headers, lines = [], []
+        for header_id in range(1, history + 1):
+            user_id = 2 + rng.randrange(users)
+            created_at = now - timedelta(minutes=rng.randrange(60 * 24 * 60))
+            status = rng.choices(statuses, weights)[0]
+            total, count = 0.0, 0
+            for _ in range(rng.randint(1, 4)):
+                quantity = rng.randint(1, 3)
+                price = rng.randrange(80, 900, 10)
+                lines.append({"user_id": user_id, "menu_id": 1 + rng.randrange(menu_items),
+                              "header_id": header_id, "quantity": quantity,
+                              "status": OrderStatus.CONFIRMED, "created_at": created_at,
+                              "total_price": price * quantity})
+                total += price * quantity
+                count += quantity
+            headers.append({"id": header_id, "user_id": user_id, "status": status,
+                            "total_price": total, "items_count": count,
+                            "created_at": created_at, "updated_at": created_at})
+        if headers:
+            connection.execute(insert(OrderHeader), headers)
+            connection.execute(insert(Order), lines)
+
+
+def percentile(sorted_values, fraction):
+    index = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+class Runner:
+    """Виконує запити тестовим клієнтом і записує час та кількість SQL-запитів"""
+
+    def __init__(self, app, engine):
+        from sqlalchemy import event
+
+        self.app = app
+        self.samples = defaultdict(list)
+        self.recording = True
+        self._queries = 0
+        event.listen(engine, "before_cursor_execute", self._count_query)
+
+    def _count_query(self, *args):
+        self._queries += 1
+
+    def request(self, client, label, method, url, data=None):
+        self._queries = 0
+        started = time.perf_counter()
+        response = client.open(url, method=method, data=data)
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise RuntimeError(f"{label}: {method} {url} -> HTTP {response.status_code}")
+        if self.recording:
+            self.samples[label].append((elapsed, self._queries))
+        return response
+
+    def get(self, client, label, url):
+        return self.request(client, label, "GET", url)
+
+    def post(self, client, label, url, data=None):
+        return self.request(client, label, "POST", url, data or {})
+
+
+def anonymous_browsing(runner, rng, context):
+    client = runner.app.test_client()
+    runner.get(client, "GET /", "/")
+    runner.get(client, "GET /menu", "/menu")
+    runner.get(client, "GET /menu?category", f"/menu?category={rng.choice(CATEGORIES)}")
+    runner.get(client, "GET /menu?q", "/menu?q=лосос")
+    runner.get(client, "GET /menu?page=2", "/menu?page=2&per_page=12")
+
+
+def customer_journey(runner, rng, context):
+    from models import Order
+    from settings import Session
+
+    client = runner.app.test_client()
+    user_id = 2 + rng.randrange(context["users"])
+    runner.post(client, "POST /auth/login", "/auth/login",
+                {"username": f"bench_user_{user_id - 2}", "password": PASSWORD})
+    runner.get(client, "GET /menu (user)", "/menu")
+    for item_id in rng.sample(range(1, context["menu_items"] + 1), 3):
+        runner.post(client, "POST /add_to_cart", f"/add_to_cart/{item_id}", {"quantity": "1"})
+    runner.get(client, "GET /cart", "/cart")
+
+    with Session() as db_session:
+        line_id = db_session.query(Order.id).filter(
+            Order.user_id == user_id, Order.header_id.is_(None)
+        ).order_by(Order.id).limit(1).scalar()
+    runner.post(client, "POST /update_cart", f"/update_cart/{line_id}", {"quantity": "2"})
+    runner.post(client, "POST /checkout", "/checkout")
+    runner.get(client, "GET /order_history", "/order_history")
+    runner.get(client, "GET /auth/logout", "/auth/logout")
+
+
+def admin_board(runner, rng, context):
+    from models import OrderHeader, OrderStatus
+    from settings import Session
+
+    client = runner.app.test_client()
+    runner.post(client, "POST /auth/login (admin)", "/auth/login",
+                {"username": "bench_admin", "password": PASSWORD})
+    runner.get(client, "GET /admin/dashboard", "/admin/dashboard")
+    response = runner.get(client, "GET /admin/orders", "/admin/orders")
+    cursor = re.search(r'cursor=([^&"]+)', response.get_data(as_text=True))
+    if cursor:
+        runner.get(client, "GET /admin/orders?cursor", f"/admin/orders?cursor={cursor.group(1)}")
+    runner.get(client, "GET /admin/orders?status", "/admin/orders?status=CONFIRMED")
+
+    with Session() as db_session:
+        header_id = db_session.query(OrderHeader.id).filter(
+            OrderHeader.status == OrderStatus.CONFIRMED
+        ).order_by(OrderHeader.created_at.desc()).limit(1).scalar()
+    if header_id:
+        runner.post(client, "POST /admin/orders/update_status",
+                    f"/admin/orders/update_status/{header_id}", {"status": "PREPARING"})
+
+
+SCENARIOS = {
+    "browse": anonymous_browsing,
+    "customer": customer_journey,
+    "admin": admin_board,
+}
+
+
+def summarize(samples, total_seconds):
+    steps = {}
+    for label, values in samples.items():
+        times = sorted(elapsed * 1000 for elapsed, _ in values)
+        steps[label] = {
+            "count": len(values),
+            "rps": round(len(values) / (sum(times) / 1000), 1),
+            "mean_ms": round(sum(times) / len(times), 2),
+            "p50_ms": round(percentile(times, 0.50), 2),
+            "p95_ms": round(percentile(times, 0.95), 2),
+            "p99_ms": round(percentile(times, 0.99), 2),
+            "queries": round(sum(queries for _, queries in values) / len(values), 2),
+        }
+    requests = sum(step["count"] for step in steps.values())
+    return {"throughput_rps": round(requests / total_seconds, 1), "requests": requests, "steps": steps}
+
+
+# Параметри, від яких залежить кількість SQL-запитів: середнє на крок включає
+# перші візити користувачів із холодним кешем, тож інша кількість прогонів дає
+# інше середнє навіть без змін у коді
+WORKLOAD_KEYS = ("iterations", "warmup", "scenarios", "seed", "users", "menu_items", "history")
+
+
+def same_workload(result, baseline):
+    return all(result["meta"].get(key) == baseline.get("meta", {}).get(key) for key in WORKLOAD_KEYS)
+
+
+def compare(result, baseline, tolerance, min_delta_ms, compare_queries=True):
+    """Повертає список регресій відносно базової лінії.
+
+    Час порівнюється з відносним допуском і абсолютним порогом, щоб шум
+    на кроках у кілька мілісекунд не вважався регресією. Кількість
+    SQL-запитів порівнюється точно, але лише для того самого навантаження.
+    """
+    regressions = []
+    for label, step in result["steps"].items():
+        reference = baseline.get("steps", {}).get(label)
+        if reference is None:
+            continue
+        if compare_queries and step["queries"] > reference["queries"]:
+            regressions.append(f"{label}: SQL-запитів {reference['queries']} -> {step['queries']}")
+        slower = step["p95_ms"] - reference["p95_ms"]
+        if step["p95_ms"] > reference["p95_ms"] * (1 + tolerance) and slower > min_delta_ms:
+            regressions.append(f"{label}: p95 {reference['p95_ms']} мс -> {step['p95_ms']} мс")
+    return regressions
+
+
+def print_report(result, baseline):
+    reference_steps = (baseline or {}).get("steps", {})
+    print(f"{'крок':<34}{'n':>5}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'SQL':>7}{'Δp95':>9}")
+    for label, step in result["steps"].items():
+        reference = reference_steps.get(label)
+        delta = f"{(step['p95_ms'] / reference['p95_ms'] - 1) * 100:+.0f}%" if reference else ""
+        print(f"{label:<34}{step['count']:>5}{step['rps']:>9.1f}{step['p50_ms']:>9.2f}"
+              f"{step['p95_ms']:>9.2f}{step['p99_ms']:>9.2f}{step['queries']:>7.1f}{delta:>9}")
+    print(f"усього запитів: {result['requests']}, пропускна здатність: {result['throughput_rps']} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20, help="прогонів кожного сценарію")
+    parser.add_argument("--warmup", type=int, default=2, help="прогонів без запису")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="лише вибрані сценарії (можна кілька разів)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--menu-items", type=int, default=60)
+    parser.add_argument("--history", type=int, default=2000, help="замовлень в історії")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="допустиме погіршення p95 (0.5 = 50%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="менше погіршення p95 (мс) не вважається регресією")
+    parser.add_argument("--json", metavar="PATH", help="зберегти результат у файл")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_environment(workdir)
+        from app import create_app
+        from settings import get_engine
+
+        rng = random.Random(args.seed)
+        context = {"users": args.users, "menu_items": args.menu_items}
+        seed_database(rng, args.users, args.menu_items, args.history)
+
+        app = create_app({"WTF_CSRF_ENABLED": False})
+        runner = Runner(app, get_engine())
+        scenarios = [SCENARIOS[name] for name in (args.scenario or SCENARIOS)]
+
+        runner.recording = False
+        for _ in range(args.warmup):
+            for scenario in scenarios:
+                scenario(runner, rng, context)
+
+        runner.recording = True
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            for scenario in scenarios:
+                scenario(runner, rng, context)
+        result = summarize(runner.samples, time.perf_counter() - started)
+        get_engine().dispose()
+
+    result["meta"] = {"iterations": args.iterations, "warmup": args.warmup,
+                      "scenarios": sorted(args.scenario or SCENARIOS), "seed": args.seed, "users": args.users,
+                      "menu_items": args.menu_items, "history": args.history,
+                      "python": sys.version.split()[0], "created_at": datetime.now().isoformat(timespec="seconds")}
+
+    baseline = None
+    if args.baseline and os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+
+    print_report(result, baseline)
+
+    for path in filter(None, (args.json, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, ensure_ascii=False, indent=2)
+        print(f"збережено: {path}")
+
+    if baseline:
+        compare_queries = same_workload(result, baseline)
+        if not compare_queries:
+            print("SQL-запити не порівнюються: параметри прогону відрізняються від базової лінії")
+        regressions = compare(result, baseline, args.tolerance, args.min_delta_ms, compare_queries)
+        for regression in regressions:
+            print(f"РЕГРЕСІЯ: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Бенчмарк холодного старту: імпорт, create_app() та перші запити воркера.
+
+Кожен прогін — окремий інтерпретатор, як у щойно перезапущеного
+воркера gunicorn. База копіюється в тимчасовий каталог, тож робоча
+база не змінюється.
+
+    python3 benchmarks/startup.py --runs 10
+    python3 benchmarks/startup.py --runs 10 --warm-up --template-cache
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app({"WARM_UP": %(warm_up)r})
+created = time.perf_counter()
+client = app.test_client()
+timings = {"import": imported - started, "create_app": created - imported}
+for name, url in %(urls)r:
+    before = time.perf_counter()
+    status = client.get(url).status_code
+    timings[name] = time.perf_counter() - before
+    if status != 200:
+        sys.exit(f"{url}: HTTP {status}")
+timings["total"] = time.perf_counter() - started
+print(json.dumps(timings))
+"""
+
+URLS = (
+    ("first_index", "/"),
+    ("first_menu", "/menu"),
+    ("first_api_menu", "/api/v1/menu"),
+    ("second_menu", "/menu?page=1"),
+)
+
+
+def prepare_database(source, workdir):
+    """Копія бази з уже застосованими міграціями"""
+    target = os.path.join(workdir, "restaurant_db")
+    if os.path.exists(source + ".db"):
+        shutil.copyfile(source + ".db", target + ".db")
+    env = dict(os.environ, DATABASE_NAME=target, DB_PROFILE="sqlite")
+    subprocess.run([sys.executable, os.path.join(ROOT, "migrate_db.py")],
+                   cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+    return env
+
+
+def run_once(env, warm_up):
+    code = PROBE % {"warm_up": warm_up, "urls": URLS}
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                            check=True, capture_output=True, text=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warm-up", action="store_true", help="прогрівати кеші в create_app()")
+    parser.add_argument("--template-cache", action="store_true",
+                        help="спільний для прогонів кеш байткоду шаблонів (TEMPLATE_CACHE_DIR)")
+    parser.add_argument("--database", default=os.path.join(ROOT, "restaurant_db"),
+                        help="база без розширення .db (як DATABASE_NAME)")
+    parser.add_argument("--json", action="store_true", help="вивести сирі результати")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = prepare_database(args.database, workdir)
+        env["APP_WARM_UP"] = "1" if args.warm_up else "0"
+        env["TEMPLATE_CACHE_DIR"] = os.path.join(workdir, "templates") if args.template_cache else ""
+        runs = [run_once(env, args.warm_up) for _ in range(args.runs)]
+
+    if args.json:
+        print(json.dumps(runs, indent=2))
+        return
+
+    print(f"прогонів: {args.runs}, прогрів: {'так' if args.warm_up else 'ні'}, "
+          f"кеш байткоду: {'так' if args.template_cache else 'ні'}")
+    print(f"{'етап':<16}{'медіана, мс':>14}{'мін, мс':>12}{'макс, мс':>12}")
+    for phase in runs[0]:
+        values = [run[phase] * 1000 for run in runs]
+        print(f"{phase:<16}{statistics.median(values):>14.1f}{min(values):>12.1f}{max(values):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Збирає статику з хешем вмісту в іменах і стиснутими копіями.
+
+Запускається при кожному розгортанні, до старту воркерів:
+
+    python3 build_assets.py [--clean]
+"""
+import argparse
+
+from services import static_assets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Збірка статичних файлів")
+    parser.add_argument("--clean", action="store_true", help="видалити попередню збірку")
+    args = parser.parse_args()
+
+    manifest = static_assets.build(clean=args.clean)
+    for name, hashed in sorted(manifest.items()):
+        print(f"{name} -> {hashed}")
+    encodings = "gzip, brotli" if static_assets.brotli is not None else "gzip (brotli не встановлено)"
+    print(f"Зібрано {len(manifest)} файлів у {static_assets.STATIC_BUILD_DIR}; стиснення: {encodings}")
+
+
+if __name__ == "__main__":
+    main()
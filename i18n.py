@@ -0,0 +1,213 @@
+"""Скомпільовані каталоги перекладів та розв'язання t('...') під час компіляції шаблонів.
+
+Каталоги з translations.py завантажуються один раз у незмінні плоскі
+словники для кожної мови. Для кожної мови є окреме середовище Jinja
+(overlay) з власним кешем скомпільованих шаблонів; розширення
+StaticTranslations підставляє переклад замість кожного виклику
+t('константа') ще на етапі компіляції, тож під час рендерингу лишаються
+лише виклики з динамічними ключами (назви страв, статуси тощо).
+
+Ключі без перекладу збираються і доступні через missing_keys();
+`python3 i18n.py` компілює всі шаблони всіма мовами та друкує звіт.
+"""
+import hashlib
+import os
+import threading
+from types import MappingProxyType
+
+from flask import has_request_context, session
+from flask.templating import Environment
+from jinja2 import FileSystemBytecodeCache
+from jinja2.ext import Extension
+from jinja2.lexer import Token
+
+from translations import translations
+
+DEFAULT_LANGUAGE = "uk"
+LANGUAGES = tuple(translations)
+MAX_MISSING_KEYS = 1000
+
+catalogs = MappingProxyType({
+    lang: MappingProxyType(dict(messages)) for lang, messages in translations.items()
+})
+
+# Змінюється разом із перекладами: входить в ETag API та в імена файлів байткоду шаблонів
+catalog_digests = MappingProxyType({
+    lang: hashlib.sha256(repr(sorted(messages.items())).encode()).hexdigest()[:8]
+    for lang, messages in catalogs.items()
+})
+
+_missing = {lang: set() for lang in LANGUAGES}
+_missing_lock = threading.Lock()
+
+
+def _record_missing(key, lang):
+    missing = _missing.get(lang)
+    if missing is None or key in missing or len(missing) >= MAX_MISSING_KEYS:
+        return
+    with _missing_lock:
+        missing.add(key)
+
+
+def current_language():
+    if has_request_context():
+        lang = session.get("language", DEFAULT_LANGUAGE)
+        if lang in catalogs:
+            return lang
+    return DEFAULT_LANGUAGE
+
+
+def gettext(key, lang=None):
+    """Переклад ключа; без lang — мовою поточного запиту. Невідомий ключ повертається як є"""
+    if not key:
+        return key
+    lang = lang or current_language()
+    value = catalogs.get(lang, {}).get(key)
+    if value is None:
+        _record_missing(key, lang)
+        return key
+    return value
+
+
+def _make_translator(lang):
+    catalog = catalogs[lang]
+
+    def translate(key):
+        value = catalog.get(key) if key else None
+        if value is None:
+            if key:
+                _record_missing(key, lang)
+            return key
+        return value
+    return translate
+
+
+# Одна функція t на мову замість нової лямбди в кожному view
+translators = MappingProxyType({lang: _make_translator(lang) for lang in LANGUAGES})
+
+
+def missing_keys():
+    with _missing_lock:
+        return {lang: sorted(keys) for lang, keys in _missing.items() if keys}
+
+
+class StaticTranslations(Extension):
+    """Замінює t('константа') на перекладений рядок під час компіляції шаблону"""
+
+    def filter_stream(self, stream):
+        lang = getattr(self.environment, "i18n_language", None)
+        if lang is None:
+            yield from stream
+            return
+
+        translate = translators[lang]
+        tokens = list(stream)
+        index = 0
+        while index < len(tokens):
+            window = tokens[index:index + 4]
+            is_call = (
+                len(window) == 4
+                and window[0].test("name:t")
+                and window[1].type == "lparen"
+                and window[2].type == "string"
+                and window[3].type == "rparen"
+                and (index == 0 or tokens[index - 1].type != "dot")
+            )
+            if is_call:
+                yield Token(window[0].lineno, "string", translate(window[2].value))
+                index += 4
+            else:
+                yield tokens[index]
+                index += 1
+
+
+class I18nEnvironment(Environment):
+    """Середовище Flask, яке віддає шаблони з кешу мови поточного запиту"""
+    i18n_language = None
+
+    def __init__(self, app, **options):
+        extensions = list(options.pop("extensions", ()))
+        extensions.append(StaticTranslations)
+        super().__init__(app, extensions=extensions, **options)
+        self._language_envs = {}
+        self._language_lock = threading.Lock()
+
+    def for_language(self, lang):
+        env = self._language_envs.get(lang)
+        if env is None:
+            with self._language_lock:
+                env = self._language_envs.get(lang)
+                if env is None:
+                    env = self.overlay(cache_size=self.cache.capacity if self.cache else 400)
+                    env.i18n_language = lang
+                    env.bytecode_cache = self._bytecode_cache(lang)
+                    self._language_envs[lang] = env
+        return env
+
+    def _bytecode_cache(self, lang):
+        """Байткод шаблонів на диску, спільний для воркерів (TEMPLATE_CACHE_DIR)"""
+        directory = self.app.config.get("TEMPLATE_CACHE_DIR")
+        if not directory:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        # Переклади вшиті в байткод, тому мова та версія каталогу входять в ім'я файлу
+        return FileSystemBytecodeCache(directory, f"__jinja2_{lang}_{catalog_digests[lang]}_%s.cache")
+
+    def _dispatch(self):
+        if self.i18n_language is None and has_request_context():
+            return self.for_language(current_language())
+        return None
+
+    def get_template(self, name, parent=None, globals=None):
+        env = self._dispatch()
+        if env is not None:
+            return env.get_template(name, parent, globals)
+        return super().get_template(name, parent, globals)
+
+    def select_template(self, names, parent=None, globals=None):
+        env = self._dispatch()
+        if env is not None:
+            return env.select_template(names, parent, globals)
+        return super().select_template(names, parent, globals)
+
+
+def inject_translations():
+    """Контекстний процесор: t та lang для шаблонів"""
+    lang = current_language()
+    return dict(t=translators[lang], lang=lang)
+
+
+def init_app(app):
+    """Підключає i18n до застосунку; викликати до першого звернення до app.jinja_env"""
+    app.jinja_environment = I18nEnvironment
+    app.context_processor(inject_translations)
+
+
+def compile_templates(app, names=None):
+    """Компілює шаблони (за замовчуванням усі) для кожної мови"""
+    env = app.jinja_env
+    names = names or env.list_templates()
+    for lang in LANGUAGES:
+        language_env = env.for_language(lang)
+        for name in names:
+            language_env.get_template(name)
+
+
+def compile_all(app):
+    """Компілює всі шаблони всіма мовами, щоб зібрати відсутні ключі"""
+    compile_templates(app)
+    return missing_keys()
+
+
+if __name__ == "__main__":
+    # Той самий модуль, що й у застосунку, а не копія __main__
+    import i18n
+    from app import create_app
+
+    report = i18n.compile_all(create_app())
+    if not report:
+        print("Усі ключі шаблонів мають переклад")
+    for lang, keys in report.items():
+        print(f"[{lang}] відсутніх перекладів: {len(keys)}")
+        for key in keys:
+            print(f"  {key}")
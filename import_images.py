@@ -0,0 +1,73 @@
+"""Переносить зовнішні зображення (посилання на CDN) у локальний конвеєр.
+
+Кожне зображення меню та налаштувань сайту з http(s)-адресою
+завантажується, зберігається через services.images і замінюється в базі
+на локальний URL. Недоступні посилання (наприклад, прострочені) лише
+виводяться у звіт — їх треба завантажити заново з адмінки.
+
+    python3 import_images.py [--dry-run]
+"""
+import argparse
+import urllib.request
+
+from models import Menu, SiteSettings
+from services.images import MAX_IMAGE_BYTES, ImageError, profile_for_setting, store_image
+from services.site_settings import IMAGE_SETTINGS
+from settings import Session
+
+TIMEOUT = 20
+
+
+def _download(url):
+    request = urllib.request.Request(url, headers={"User-Agent": "restaurant-image-import"})
+    with urllib.request.urlopen(request, timeout=TIMEOUT) as response:
+        return response.read(MAX_IMAGE_BYTES + 1)
+
+
+def _import(url, profile, cache):
+    # Одне посилання може використовуватись кількома стравами
+    if (url, profile) not in cache:
+        cache[url, profile] = store_image(_download(url), profile)
+    return cache[url, profile]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Завантаження зовнішніх зображень у static/uploads")
+    parser.add_argument("--dry-run", action="store_true", help="лише показати, що буде перенесено")
+    args = parser.parse_args()
+
+    targets = []
+    with Session() as db_session:
+        for item in db_session.query(Menu).filter(Menu.image_path.like("http%")):
+            targets.append((item, "image_path", "menu", f"menu #{item.id}"))
+        for setting in db_session.query(SiteSettings).filter(
+            SiteSettings.setting_name.in_(IMAGE_SETTINGS), SiteSettings.setting_value.like("http%")
+        ):
+            targets.append((setting, "setting_value", profile_for_setting(setting.setting_name),
+                            setting.setting_name))
+
+        cache, failed = {}, 0
+        for target, attribute, profile, label in targets:
+            url = getattr(target, attribute)
+            if args.dry_run:
+                print(f"{label}: {url}")
+                continue
+            try:
+                setattr(target, attribute, _import(url, profile, cache))
+                print(f"{label}: {getattr(target, attribute)}")
+            except (OSError, ImageError) as error:
+                failed += 1
+                print(f"{label}: помилка — {error}")
+        if not args.dry_run:
+            db_session.commit()
+
+    if args.dry_run:
+        print(f"Знайдено {len(targets)}")
+        return
+    print(f"Знайдено {len(targets)}, не вдалося перенести {failed}")
+    if len(targets) > failed:
+        print("Перезапустіть застосунок або збережіть налаштування в адмінці, щоб скинути кеші")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,23 @@
-from models import Base, User, Menu, Order, Reservation, SiteSettings
+import argparse
+import sys
+
+from models import Base, DiningTable, User, Menu, Order, Reservation, SiteSettings
 from settings import Session
+from migrate_db import upgrade
 from werkzeug.security import generate_password_hash
 
-def init_db():
+def init_db(reset=None):
+    """reset=None — запитати (лише в інтерактивному терміналі), True/False — без запитання"""
     base = Base()
     
     print("=" * 50)
     print("ІНІЦІАЛІЗАЦІЯ БАЗИ ДАНИХ СУШИ-БАРУ")
     print("=" * 50)
     
-    choice = input("Видалити всі дані та створити нову базу? (y/n): ").lower()
-    
-    if choice == 'y':
+    if reset is None:
+        reset = sys.stdin.isatty() and input("Видалити всі дані та створити нову базу? (y/n): ").lower() == 'y'
+
+    if reset:
         print("Видаляємо стару базу даних...")
         base.drop_db()
         print("Створюємо нову базу даних...")
@@ -19,7 +25,7 @@ def init_db():
         print("Базу даних створено!")
     else:
         print("Просто створюємо таблиці (якщо не існують)...")
-        base.create_db()
+        upgrade()
         print("Базу даних перевірено!")
 
     session = Session()
@@ -229,6 +235,15 @@ def init_db():
         menu_count = session.query(Menu).count()
         print(f"  Меню вже заповнене! Кількість страв: {menu_count}")
 
+    # Столики залу для бронювання
+    if not session.query(DiningTable).first():
+        tables = [DiningTable(name=f"Столик {number}", seats=seats)
+                  for number, seats in enumerate((2, 2, 2, 4, 4, 4, 6, 8), start=1)]
+        session.add_all(tables)
+        print(f"✅ Додано {len(tables)} столиків!")
+    else:
+        print(f"  Столики вже існують! Кількість: {session.query(DiningTable).count()}")
+
     try:
         session.commit()
         print("=" * 50)
@@ -255,4 +270,10 @@ def init_db():
 
 
 if __name__ == "__main__":
-    init_db()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Ініціалізація бази даних суші-бару")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--reset", action="store_true", default=None,
+                      help="видалити всі дані без запитання")
+    mode.add_argument("--keep", dest="reset", action="store_false",
+                      help="лише створити відсутні таблиці та оновити схему")
+    init_db(parser.parse_args().reset)
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""Оновлення схеми існуючої бази даних без видалення даних.
+
+Створює відсутні таблиці, колонки та індекси, оголошені в models.py,
+переносить старі замовлення (один рядок = одна страва) у заголовки і в
+SQLite один раз перебудовує таблиці з AUTOINCREMENT.
+Запуск: python3 migrate_db.py
+"""
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.schema import CreateTable
+
+from models import ArchivedOrder, ArchivedOrderHeader, Base, Order, OrderHeader
+from settings import get_engine
+
+
+def add_missing_columns(bind):
+    """Додає nullable-колонки моделей, яких ще немає в існуючих таблицях"""
+    inspector = inspect(bind)
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=bind.dialect)
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+            for foreign_key in column.foreign_keys:
+                ddl += f" REFERENCES {foreign_key.column.table.name} ({foreign_key.column.name})"
+            bind.execute(text(ddl))
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+# Таблиці з sqlite_autoincrement і архіви, чиї id вони не мають видавати повторно
+AUTOINCREMENT_TABLES = (
+    (OrderHeader.__table__, ArchivedOrderHeader.__table__),
+    (Order.__table__, ArchivedOrder.__table__),
+)
+
+
+def enable_sqlite_autoincrement(bind):
+    """Перебудовує таблиці, створені без AUTOINCREMENT; повертає їх назви.
+
+    Без AUTOINCREMENT SQLite видає max(id) + 1, тож після видалення чи
+    архівації найновіших замовлень їхні номери дісталися б новим.
+    ALTER TABLE цього не вміє, тому таблиця копіюється в нову з тією самою
+    схемою (індекси створить create_missing_indexes), а лічильник
+    sqlite_sequence не менший за найбільший id в архіві.
+    """
+    if bind.dialect.name != "sqlite":
+        return []
+    rebuilt = []
+    for table, archive in AUTOINCREMENT_TABLES:
+        ddl = bind.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                           {"name": table.name}).scalar()
+        if ddl is None or "AUTOINCREMENT" in ddl.upper():
+            continue
+        new_name = f"{table.name}_autoincrement"
+        bind.execute(text(f"DROP TABLE IF EXISTS {new_name}"))
+        # Копія схеми з усіма таблицями, щоб зовнішні ключі знайшли свої цілі
+        metadata = MetaData()
+        for other in Base.metadata.sorted_tables:
+            other.to_metadata(metadata, name=new_name if other is table else None)
+        bind.execute(CreateTable(metadata.tables[new_name]))
+        existing = {column["name"] for column in inspect(bind).get_columns(table.name)}
+        columns = ", ".join(column.name for column in table.columns if column.name in existing)
+        bind.execute(text(f"INSERT INTO {new_name} ({columns}) SELECT {columns} FROM {table.name}"))
+        bind.execute(text(f"DROP TABLE {table.name}"))
+        bind.execute(text(f"ALTER TABLE {new_name} RENAME TO {table.name}"))
+        rebuilt.append(f"{table.name}: AUTOINCREMENT")
+
+    for table, archive in AUTOINCREMENT_TABLES:
+        if not inspect(bind).has_table(archive.name):
+            continue
+        highest = bind.execute(text(
+            f"SELECT max(coalesce((SELECT max(id) FROM {table.name}), 0), "
+            f"coalesce((SELECT max(id) FROM {archive.name}), 0))"
+        )).scalar()
+        updated = bind.execute(text("UPDATE sqlite_sequence SET seq = max(seq, :seq) WHERE name = :name"),
+                               {"seq": highest, "name": table.name}).rowcount
+        if not updated and highest:
+            bind.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"),
+                         {"name": table.name, "seq": highest})
+    return rebuilt
+
+
+def create_missing_indexes(bind):
+    """Створює індекси моделей, яких ще немає в базі; повертає їх назви"""
+    inspector = inspect(bind)
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind)
+                created.append(index.name)
+    return created
+
+
+def backfill_order_headers(bind):
+    """Кожен оформлений рядок без заголовка отримує власний заголовок.
+
+    Id заголовків зсуваємо на поточний максимум, щоб обидва запити
+    лишались set-based і не перетиналися з уже створеними заголовками.
+    """
+    offset = bind.execute(text("SELECT coalesce(max(id), 0) FROM order_headers")).scalar()
+    legacy = "header_id IS NULL AND status != 'PENDING'"
+    moved = bind.execute(text(
+        "INSERT INTO order_headers (id, user_id, status, total_price, items_count, created_at, updated_at) "
+        "SELECT id + :offset, user_id, status, coalesce(total_price, 0), quantity, created_at, created_at "
+        f"FROM orders WHERE {legacy}"
+    ), {"offset": offset}).rowcount
+    if moved:
+        bind.execute(text(f"UPDATE orders SET header_id = id + :offset WHERE {legacy}"), {"offset": offset})
+        if bind.dialect.name == "postgresql":
+            # Явні id не зсувають послідовність — інакше перше оформлення впаде на дублікаті ключа
+            bind.execute(text(
+                "SELECT setval(pg_get_serial_sequence('order_headers', 'id'), (SELECT max(id) FROM order_headers))"
+            ))
+    return moved
+
+
+def upgrade():
+    engine = get_engine()
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        added = add_missing_columns(connection)
+        rebuilt = enable_sqlite_autoincrement(connection)
+        created = create_missing_indexes(connection)
+        moved = backfill_order_headers(connection)
+        if (created or moved) and connection.dialect.name == "sqlite":
+            # Оновлюємо статистику, щоб планувальник почав використовувати нові індекси
+            connection.execute(text("ANALYZE"))
+    return added + rebuilt + created + ([f"order_headers: {moved}"] if moved else [])
+
+
+if __name__ == "__main__":
+    changes = upgrade()
+    if changes:
+        print(f"Змін у схемі: {len(changes)}")
+        for change in changes:
+            print(f"  {change}")
+    else:
+        print("Схема бази даних актуальна")
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import DateTime, ForeignKey, String, Text, select, Enum, JSON
+from sqlalchemy import DateTime, ForeignKey, Index, String, Text, select, Enum, JSON, event, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from settings import Session
 from flask_login import UserMixin
@@ -23,6 +23,7 @@ class User(UserMixin, Base):
     hash_password: Mapped[str] = mapped_column(String(200), nullable=False)
     is_admin: Mapped[bool] = mapped_column(default=False)
     orders: Mapped[list["Order"]] = relationship("Order", back_populates="user")
+    order_headers: Mapped[list["OrderHeader"]] = relationship("OrderHeader", back_populates="user")
     reservations: Mapped[list["Reservation"]] = relationship("Reservation", back_populates="user")
 
     def __repr__(self) -> str:
@@ -75,6 +76,9 @@ class SiteSettings(Base):
 
 class Menu(Base):
     __tablename__ = "menu"
+    __table_args__ = (
+        Index("ix_menu_active_category", "active", "category"),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
     price: Mapped[float] = mapped_column(nullable=False)
@@ -88,32 +92,187 @@ class Menu(Base):
     def __repr__(self) -> str:
         return f"Menu: {self.id}, {self.name}"
 
+class OrderHeader(Base):
+    """Оформлене замовлення: статус, підсумки та час; страви — у рядках Order"""
+    __tablename__ = "order_headers"
+    __table_args__ = (
+        Index("ix_order_headers_user_created", "user_id", "created_at", "id"),
+        Index("ix_order_headers_status_created", "status", "created_at"),
+        Index("ix_order_headers_created_id", "created_at", "id"),
+        # Id не повторюються після видалення чи архівації: номер замовлення в
+        # історії однозначний, а архів зберігає вихідні id
+        {"sqlite_autoincrement": True},
+    )
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    status: Mapped[OrderStatus] = mapped_column(Enum(OrderStatus), default=OrderStatus.CONFIRMED)
+    total_price: Mapped[float] = mapped_column(default=0)
+    items_count: Mapped[int] = mapped_column(default=0)
+    # Пріоритет на кухні: більший готується раніше; nullable, щоб migrate_db додав колонку
+    priority: Mapped[int | None] = mapped_column(default=0, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    user: Mapped["User"] = relationship("User", back_populates="order_headers")
+    lines: Mapped[list["Order"]] = relationship("Order", back_populates="header")
+
+    def __repr__(self) -> str:
+        return f"OrderHeader: {self.id}, User ID: {self.user_id}, Status: {self.status.value}"
+
+
+class OrderEvent(Base):
+    """Подія замовлення для живої дошки (outbox).
+
+    Пишеться в тій самій транзакції, що й зміна замовлення, тож подія
+    з'являється рівно тоді, коли зміна закомічена. Id — номер події
+    для Last-Event-ID.
+    """
+    __tablename__ = "order_events"
+    __table_args__ = (
+        Index("ix_order_events_created_at", "created_at"),
+    )
+    id: Mapped[int] = mapped_column(primary_key=True)
+    header_id: Mapped[int] = mapped_column(nullable=False)
+    kind: Mapped[str] = mapped_column(String(30), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+
+    def __repr__(self) -> str:
+        return f"OrderEvent: {self.id}, {self.kind}, Order ID: {self.header_id}"
+
+
+# Кошик — це рядки зі статусом PENDING без заголовка, тому для них окремий частковий індекс
+CART_CONDITION = text("status = 'PENDING'")
+
+
 class Order(Base):
+    """Рядок замовлення (одна страва).
+
+    Поки header_id порожній, а статус PENDING, рядок лежить у кошику.
+    Після оформлення статус рядка стає CONFIRMED, а подальший життєвий
+    цикл замовлення ведеться лише в OrderHeader.
+    """
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_user_status", "user_id", "status"),
+        Index("ix_orders_status_created", "status", "created_at"),
+        Index("ix_orders_created_id", "created_at", "id"),
+        Index("ix_orders_header_id", "header_id"),
+        Index("ix_orders_cart", "user_id", "menu_id"),
+        {"sqlite_autoincrement": True},
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     menu_id: Mapped[int] = mapped_column(ForeignKey("menu.id"), nullable=False)
+    header_id: Mapped[int | None] = mapped_column(ForeignKey("order_headers.id"), nullable=True)
     quantity: Mapped[int] = mapped_column(default=1)
     status: Mapped[OrderStatus] = mapped_column(Enum(OrderStatus), default=OrderStatus.PENDING)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
     total_price: Mapped[float] = mapped_column(nullable=True)
     
     user: Mapped["User"] = relationship("User", back_populates="orders")
     menu_item: Mapped["Menu"] = relationship("Menu", back_populates="orders")
+    header: Mapped["OrderHeader"] = relationship("OrderHeader", back_populates="lines")
 
     def __repr__(self) -> str:
         return f"Order: {self.id}, User ID: {self.user_id}, Status: {self.status.value}"
 
+CART_INDEX = next(index for index in Order.__table__.indexes if index.name == "ix_orders_cart")
+
+
+@event.listens_for(CART_INDEX, "before_create")
+def _cart_index_where(index, connection, **kw):
+    """Умова часткового індексу для діалекту, який його створює.
+
+    Якщо оголосити postgresql_where у моделі, SQLAlchemy імпортує весь
+    діалект Postgres навіть для SQLite; а профіль з DB_PROFILE може не
+    збігатися з рушієм, для якого створюються таблиці.
+    """
+    index.dialect_kwargs[f"{connection.dialect.name}_where"] = CART_CONDITION
+
+
+class ArchivedOrderHeader(Base):
+    """Завершене замовлення, перенесене з order_headers (див. archive_orders.py).
+
+    Id збігається з id вихідного заголовка, тож номер замовлення в
+    історії не змінюється.
+    """
+    __tablename__ = "order_headers_archive"
+    __table_args__ = (
+        Index("ix_order_headers_archive_user_created", "user_id", "created_at", "id"),
+        # max(archived_at) — дешева ознака нової архівації для панелі (services.dashboard)
+        Index("ix_order_headers_archive_archived_at", "archived_at"),
+    )
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    status: Mapped[OrderStatus] = mapped_column(Enum(OrderStatus), nullable=False)
+    total_price: Mapped[float] = mapped_column(default=0)
+    items_count: Mapped[int] = mapped_column(default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+
+    def __repr__(self) -> str:
+        return f"ArchivedOrderHeader: {self.id}, User ID: {self.user_id}, Status: {self.status.value}"
+
+
+class ArchivedOrder(Base):
+    """Рядок архівного замовлення; назва страви зберігається на момент архівації"""
+    __tablename__ = "orders_archive"
+    __table_args__ = (
+        Index("ix_orders_archive_header_id", "header_id"),
+    )
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    header_id: Mapped[int] = mapped_column(ForeignKey("order_headers_archive.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(nullable=False)
+    # Без зовнішнього ключа: страву можна видалити з меню, а архів лишається
+    menu_id: Mapped[int] = mapped_column(nullable=False)
+    menu_name: Mapped[str] = mapped_column(String(255), nullable=True)
+    quantity: Mapped[int] = mapped_column(default=1)
+    total_price: Mapped[float] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"ArchivedOrder: {self.id}, Order ID: {self.header_id}"
+
+
+class DiningTable(Base):
+    """Столик залу: кількість місць обмежує розмір компанії"""
+    __tablename__ = "dining_tables"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
+    seats: Mapped[int] = mapped_column(nullable=False)
+    active: Mapped[bool] = mapped_column(default=True)
+
+    reservations: Mapped[list["Reservation"]] = relationship("Reservation", back_populates="table")
+
+    def __repr__(self) -> str:
+        return f"DiningTable: {self.id}, {self.name}, Seats: {self.seats}"
+
+
 class Reservation(Base):
+    """Бронювання столика на проміжок [time_start, time_end).
+
+    Старі бронювання без столика та часу завершення лишаються в базі,
+    але не займають столиків.
+    """
     __tablename__ = "reservations"
+    __table_args__ = (
+        Index("ix_reservations_time_start", "time_start"),
+        Index("ix_reservations_user_id", "user_id"),
+        Index("ix_reservations_table_time", "table_id", "time_start"),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    table_id: Mapped[int | None] = mapped_column(ForeignKey("dining_tables.id"), nullable=True)
     time_start: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    time_end: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     guests: Mapped[int] = mapped_column(default=2)
     notes: Mapped[str] = mapped_column(Text, nullable=True)
     status: Mapped[str] = mapped_column(String(20), default="pending")  
     
     user: Mapped["User"] = relationship("User", back_populates="reservations")
+    table: Mapped["DiningTable"] = relationship("DiningTable", back_populates="reservations")
 
     def __repr__(self) -> str:
         return f"Reservation: {self.id}, User ID: {self.user_id}, Time: {self.time_start}"
\ No newline at end of file
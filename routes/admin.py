@@ -1,62 +1,83 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, session
+from flask import Blueprint, Response, jsonify, render_template, request, flash, redirect, stream_with_context, url_for
+from datetime import date, datetime, time, timedelta
 from flask_login import login_required, current_user
+from sqlalchemy.orm import joinedload, selectinload
 from settings import Session
-from models import Menu, Order, OrderStatus, SiteSettings, User, Reservation
+from i18n import gettext as t
+from models import ArchivedOrder, ArchivedOrderHeader, DiningTable, Menu, Order, OrderHeader, OrderStatus, User, Reservation
+from services import menu_search
+from services import order_events
+from services import orders as order_service
+from services import reservations as reservation_service
+from services.catalog import invalidate_catalog
+from services.dashboard import get_dashboard_stats
+from services.instrumentation import SLOW_REQUEST_MS, endpoint_summaries
+from services.kitchen import TRANSITIONS, kitchen_queue
+from services.page_cache import clear_page_cache
+from services.pagination import decode_cursor, fetch_page
+from services.images import ImageError, profile_for_setting, store_upload
+from services.site_settings import IMAGE_SETTINGS, get_site_images, save_site_images, site_settings_cache
+from services.user_cache import evict_user, has_admin_rights
 
 bp = Blueprint('admin', __name__, url_prefix='/admin')
 
+ORDERS_PER_PAGE = 50
+
 
 def admin_required(func):
     def wrapper(*args, **kwargs):
-        if not current_user.is_admin:
-            from app import t
+        if not has_admin_rights(current_user.id):
             flash(t('Доступ заборонено. Потрібні права адміністратора'), "error")
             return redirect(url_for("index"))
         return func(*args, **kwargs)
     wrapper.__name__ = func.__name__
     return wrapper
 
+def _menu_changed():
+    """Скидає кеші, що залежать від меню, після коміту змін"""
+    invalidate_catalog()
+    clear_page_cache()
+
 @bp.route("/dashboard")
 @login_required
 @admin_required
 def dashboard():
-    current_lang = session.get('language', 'uk')
-    from app import t
-    with Session() as db_session:
+    images = get_site_images()
+    return render_template("admin/dashboard.html",
+                           stats=get_dashboard_stats(),
+                           OrderStatus=OrderStatus,
+                           background_image=images.get('admin_panel_background_image'))
 
-        total_orders = db_session.query(Order).count()
-        pending_orders = db_session.query(Order).filter(Order.status == OrderStatus.PENDING).count()
-        active_menu_items = db_session.query(Menu).filter(Menu.active == True).count()
-        
-        return render_template("admin/dashboard.html", 
-                             total_orders=total_orders,
-                             pending_orders=pending_orders,
-                             active_menu_items=active_menu_items,
-                             t=lambda key: t(key, current_lang),
-                             lang=current_lang)
+@bp.route("/performance")
+@login_required
+@admin_required
+def performance():
+    return render_template("admin/performance.html",
+                           summaries=endpoint_summaries(),
+                           slow_request_ms=SLOW_REQUEST_MS)
 
 @bp.route("/menu")
 @login_required
 @admin_required
 def menu_management():
-    current_lang = session.get('language', 'uk')
-    from app import t
     with Session() as db_session:
         menu_items = db_session.query(Menu).all()
-        return render_template("admin/menu.html", menu_items=menu_items, t=lambda key: t(key, current_lang), lang=current_lang)
+        return render_template("admin/menu.html", menu_items=menu_items)
 
 @bp.route("/menu/add", methods=["GET", "POST"])
 @login_required
 @admin_required
 def add_menu_item():
-    current_lang = session.get('language', 'uk')
-    from app import t
     if request.method == "POST":
         name = request.form.get("name")
         price = float(request.form.get("price"))
         description = request.form.get("description")
         category = request.form.get("category")
-        image_path = request.form.get("image_path", "")
+        try:
+            image_path = store_upload(request.files.get("image_file"), "menu") or request.form.get("image_path", "")
+        except ImageError as error:
+            flash(t(str(error)), "error")
+            return render_template("admin/add_menu.html"), 400
         
         new_item = Menu(
             name=name,
@@ -68,19 +89,20 @@ def add_menu_item():
         
         with Session() as db_session:
             db_session.add(new_item)
+            db_session.flush()
+            menu_search.index_item(db_session, new_item)
             db_session.commit()
+        _menu_changed()
         
         flash(t('Страву додано успішно'), "success")
         return redirect(url_for("admin.menu_management"))
     
-    return render_template("admin/add_menu.html", t=lambda key: t(key, current_lang), lang=current_lang)
+    return render_template("admin/add_menu.html")
 
 @bp.route("/menu/edit/<int:item_id>", methods=["GET", "POST"])
 @login_required
 @admin_required
 def edit_menu_item(item_id):
-    current_lang = session.get('language', 'uk')
-    from app import t
     with Session() as db_session:
         item = db_session.query(Menu).filter(Menu.id == item_id).first()
         
@@ -89,60 +111,112 @@ def edit_menu_item(item_id):
             return redirect(url_for("admin.menu_management"))
         
         if request.method == "POST":
+            try:
+                uploaded = store_upload(request.files.get("image_file"), "menu")
+            except ImageError as error:
+                flash(t(str(error)), "error")
+                return render_template("admin/edit_menu.html", item=item), 400
             item.name = request.form.get("name")
             item.price = float(request.form.get("price"))
             item.description = request.form.get("description")
             item.category = request.form.get("category")
-            item.image_path = request.form.get("image_path", "")
+            item.image_path = uploaded or request.form.get("image_path", "")
             item.active = bool(request.form.get("active"))
             
+            menu_search.index_item(db_session, item)
             db_session.commit()
+            _menu_changed()
             flash(t('Страву оновлено успішно'), "success")
             return redirect(url_for("admin.menu_management"))
         
-        return render_template("admin/edit_menu.html", item=item, t=lambda key: t(key, current_lang), lang=current_lang)
+        return render_template("admin/edit_menu.html", item=item)
 
 @bp.route("/menu/delete/<int:item_id>")
 @login_required
 @admin_required
 def delete_menu_item(item_id):
-    current_lang = session.get('language', 'uk')
-    from app import t
     with Session() as db_session:
         item = db_session.query(Menu).filter(Menu.id == item_id).first()
         
         if item:
             db_session.delete(item)
+            menu_search.remove_item(db_session, item_id)
             db_session.commit()
+            _menu_changed()
             flash(t('Страву видалено успішно'), "success")
         else:
             flash(t('Страву не знайдено'), "error")
     return redirect(url_for("admin.menu_management"))
 
 
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
 @bp.route("/orders")
 @login_required
 @admin_required
 def orders_management():
-    current_lang = session.get('language', 'uk')
-    from app import t
+    status_name = request.args.get("status")
+    status = OrderStatus[status_name] if status_name in OrderStatus.__members__ else None
+    date_from = _parse_date(request.args.get("date_from"))
+    date_to = _parse_date(request.args.get("date_to"))
+    cursor = decode_cursor(request.args.get("cursor"))
+
     with Session() as db_session:
-        orders = db_session.query(Order).order_by(Order.created_at.desc()).all()
-        return render_template("admin/orders.html", orders=orders, OrderStatus=OrderStatus, t=lambda key: t(key, current_lang), lang=current_lang)
+        query = db_session.query(OrderHeader).options(
+            joinedload(OrderHeader.user),
+            selectinload(OrderHeader.lines).joinedload(Order.menu_item)
+        )
+        if status:
+            query = query.filter(OrderHeader.status == status)
+        if date_from:
+            query = query.filter(OrderHeader.created_at >= datetime.combine(date_from, time.min))
+        if date_to:
+            query = query.filter(OrderHeader.created_at < datetime.combine(date_to + timedelta(days=1), time.min))
+
+        orders, next_cursor = fetch_page(query, OrderHeader.created_at, OrderHeader.id, cursor, ORDERS_PER_PAGE)
+        filters = {
+            'status': status.name if status else None,
+            'date_from': date_from.isoformat() if date_from else None,
+            'date_to': date_to.isoformat() if date_to else None,
+        }
+        return render_template("admin/orders.html",
+                               orders=orders,
+                               OrderStatus=OrderStatus,
+                               filters=filters,
+                               next_cursor=next_cursor,
+                               is_first_page=cursor is None,
+                               last_event_id=order_events.latest_event_id(db_session))
+
+
+@bp.route("/orders/events")
+@login_required
+@admin_required
+def order_events_stream():
+    """Потік подій замовлень (SSE) для сторінки замовлень"""
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    response = Response(stream_with_context(order_events.stream(last_event_id)),
+                        mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # Вимикає буферизацію відповіді в nginx
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
 @bp.route("/orders/update_status/<int:order_id>", methods=["POST"])
 @login_required
 @admin_required
 def update_order_status(order_id):
-    current_lang = session.get('language', 'uk')
-    from app import t
-
     new_status = request.form.get("status")
     with Session() as db_session:
-        order = db_session.query(Order).filter(Order.id == order_id).first()
+        order = db_session.get(OrderHeader, order_id)
         
-        if order and new_status in [status.name for status in OrderStatus]:
-            order.status = OrderStatus[new_status]
+        if order and new_status in OrderStatus.__members__:
+            order_service.change_status(db_session, [order_id], OrderStatus[new_status])
             db_session.commit()
             flash(t('Статус замовлення оновлено'), "success")
         else:
@@ -150,18 +224,15 @@ def update_order_status(order_id):
     
     return redirect(url_for("admin.orders_management"))
 
-@bp.route("/orders/cancel/<int:order_id>")
+@bp.route("/orders/cancel/<int:order_id>", methods=["POST"])
 @login_required
 @admin_required
 def cancel_order(order_id):
-    current_lang = session.get('language', 'uk')
-    from app import t
-
     with Session() as db_session:
-        order = db_session.query(Order).filter(Order.id == order_id).first()
+        order = db_session.get(OrderHeader, order_id)
         
         if order:
-            order.status = OrderStatus.CANCELLED
+            order_service.change_status(db_session, [order_id], OrderStatus.CANCELLED)
             db_session.commit()
             flash(t('Замовлення скасовано адміном'), "success")
         else:
@@ -170,75 +241,213 @@ def cancel_order(order_id):
     return redirect(url_for("admin.orders_management"))
 
 
+def _wants_json():
+    return request.accept_mimetypes.best == "application/json"
+
+
+BULK_ACTIONS = {
+    "cancel": order_service.bulk_cancel,
+    "advance": order_service.bulk_advance,
+    "delete": order_service.bulk_delete,
+}
+
+
+@bp.route("/orders/bulk", methods=["POST"])
+@login_required
+@admin_required
+def bulk_orders():
+    """Масова операція над вибраними замовленнями однією транзакцією"""
+    action = BULK_ACTIONS.get(request.form.get("action"))
+    order_ids = [int(value) for value in request.form.getlist("order_ids") if value.isdigit()]
+    back = request.form.get("next", "")
+    if not back.startswith("/admin/orders"):
+        back = url_for("admin.orders_management")
+
+    if action is None or not order_ids:
+        if _wants_json():
+            return jsonify(error=t('Не вибрано замовлень або дію')), 400
+        flash(t('Не вибрано замовлень або дію'), "error")
+        return redirect(back)
+
+    with Session() as db_session:
+        results = action(db_session, order_ids)
+        db_session.commit()
+
+    if _wants_json():
+        return jsonify(action=request.form["action"], results=results)
+    changed = sum(result == order_service.CHANGED for result in results.values())
+    flash(f"{t('Змінено замовлень')}: {changed}", "success")
+    skipped = sorted(order_id for order_id, result in results.items() if result != order_service.CHANGED)
+    if skipped:
+        flash(f"{t('Пропущено замовлень')}: {', '.join(f'#{order_id}' for order_id in skipped)}", "error")
+    return redirect(back)
+
+
+@bp.route("/kitchen")
+@login_required
+@admin_required
+def kitchen():
+    tickets = kitchen_queue.tickets()
+    # Потік подій стартує з події, до якої черга вже актуальна
+    return render_template("admin/kitchen.html", tickets=tickets,
+                           OrderStatus=OrderStatus, last_event_id=kitchen_queue.cursor)
+
+
+@bp.route("/kitchen/board")
+@login_required
+@admin_required
+def kitchen_board():
+    """Лише список карток: екран кухні оновлює його після подій"""
+    return render_template("admin/kitchen_board.html", tickets=kitchen_queue.tickets(),
+                           OrderStatus=OrderStatus)
+
+
+@bp.route("/kitchen/transition", methods=["POST"])
+@login_required
+@admin_required
+def kitchen_transition():
+    """Переводить вибрані замовлення в новий статус однією транзакцією"""
+    status_name = request.form.get("status")
+    target = OrderStatus[status_name] if status_name in OrderStatus.__members__ else None
+    order_ids = {int(value) for value in request.form.getlist("order_ids") if value.isdigit()}
+    if target not in TRANSITIONS or not order_ids:
+        if _wants_json():
+            return jsonify(error=t('Помилка оновлення статусу')), 400
+        flash(t('Помилка оновлення статусу'), "error")
+        return redirect(url_for("admin.kitchen"))
+
+    with Session() as db_session:
+        previous = order_service.change_status(db_session, order_ids, target, allowed_from=TRANSITIONS[target])
+        db_session.commit()
+
+    changed, skipped = sorted(previous), sorted(order_ids - set(previous))
+    if _wants_json():
+        return jsonify(status=target.name, changed=changed, skipped=skipped)
+    flash(f"{t('Статус замовлення оновлено')}: {len(changed)}", "success")
+    if skipped:
+        flash(f"{t('Пропущено замовлень')}: {len(skipped)}", "error")
+    return redirect(url_for("admin.kitchen"))
+
+
+@bp.route("/kitchen/priority/<int:order_id>", methods=["POST"])
+@login_required
+@admin_required
+def kitchen_priority(order_id):
+    try:
+        priority = int(request.form.get("priority", ""))
+    except ValueError:
+        priority = None
+    with Session() as db_session:
+        found = priority is not None and order_service.set_priority(db_session, order_id, priority)
+        db_session.commit()
+    if _wants_json():
+        return jsonify(id=order_id, priority=priority), (200 if found else 404)
+    if not found:
+        flash(t('Замовлення не знайдено'), "error")
+    return redirect(url_for("admin.kitchen"))
+
+
+@bp.route("/reservations")
+@login_required
+@admin_required
+def reservations():
+    day = reservation_service.parse_day(request.args.get("date"), date.today())
+    with Session() as db_session:
+        day_reservations = reservation_service.day_reservations(db_session, day)
+        tables = db_session.query(DiningTable).order_by(DiningTable.seats, DiningTable.name).all()
+        return render_template("admin/reservations.html", day=day, reservations=day_reservations, tables=tables,
+                               active_statuses=reservation_service.ACTIVE_STATUSES)
+
+
+@bp.route("/reservations/<int:reservation_id>/cancel", methods=["POST"])
+@login_required
+@admin_required
+def cancel_reservation(reservation_id):
+    with Session() as db_session:
+        cancelled = reservation_service.cancel(db_session, reservation_id)
+        db_session.commit()
+    if cancelled:
+        flash(t('Бронювання скасовано'), "success")
+    else:
+        flash(t('Бронювання не знайдено'), "error")
+    return redirect(url_for("admin.reservations", date=request.form.get("date")))
+
+
+@bp.route("/reservations/tables", methods=["POST"])
+@login_required
+@admin_required
+def add_table():
+    name = request.form.get("name", "").strip()
+    seats = request.form.get("seats", 0, type=int)
+    if not name or seats < 1:
+        flash(t('Вкажіть назву та кількість місць'), "error")
+        return redirect(url_for("admin.reservations"))
+    with Session() as db_session:
+        if db_session.query(DiningTable).filter(DiningTable.name == name).first():
+            flash(t('Столик з такою назвою вже існує'), "error")
+            return redirect(url_for("admin.reservations"))
+        db_session.add(DiningTable(name=name, seats=seats))
+        db_session.commit()
+    # Набір столиків змінився — дні індексу перебудуються з бази
+    reservation_service.reservation_index.invalidate()
+    flash(t('Столик додано'), "success")
+    return redirect(url_for("admin.reservations"))
+
+
+@bp.route("/reservations/tables/<int:table_id>/toggle", methods=["POST"])
+@login_required
+@admin_required
+def toggle_table(table_id):
+    with Session() as db_session:
+        table = db_session.get(DiningTable, table_id)
+        if table is None:
+            flash(t('Столик не знайдено'), "error")
+            return redirect(url_for("admin.reservations"))
+        table.active = not table.active
+        db_session.commit()
+    reservation_service.reservation_index.invalidate()
+    return redirect(url_for("admin.reservations"))
+
+
 @bp.route("/settings", methods=["GET", "POST"])
 @login_required
 @admin_required
 def site_settings():
-    current_lang = session.get('language', 'uk')
-    from app import t
     with Session() as db_session:
         if request.method == "POST":
-            settings_data = {
-                'main_background_image': request.form.get('main_background_image'),
-                'menu_background_image': request.form.get('menu_background_image'),
-                'admin_panel_background_image': request.form.get('admin_panel_background_image'),
-                'cart_background_image': request.form.get('cart_background_image'),
-                'order_history_background_image': request.form.get('order_history_background_image'),
-                'logo_image': request.form.get('logo_image'),
-                'mini_logo_image': request.form.get('mini_logo_image')
-            }
-
-            for setting_name, setting_value in settings_data.items():
-                setting = db_session.query(SiteSettings).filter(
-                    SiteSettings.setting_name == setting_name
-                ).first()
-
-                if setting:
-                    setting.setting_value = setting_value
-                else:
-                    new_setting = SiteSettings(
-                        setting_name=setting_name,
-                        setting_value=setting_value,
-                        description=f"Налаштування {setting_name}"
-                    )
-                    db_session.add(new_setting)
-
-            db_session.commit()
+            settings_data = {name: request.form.get(name) for name in IMAGE_SETTINGS}
+            try:
+                for name in IMAGE_SETTINGS:
+                    uploaded = store_upload(request.files.get(f"{name}_file"), profile_for_setting(name))
+                    if uploaded:
+                        settings_data[name] = uploaded
+            except ImageError as error:
+                flash(t(str(error)), "error")
+                return redirect(url_for("admin.site_settings"))
+
+            if save_site_images(db_session, settings_data):
+                db_session.commit()
+                site_settings_cache.invalidate()
+                clear_page_cache()
             flash( t('Налаштування успішно збережено!'), "success")
             return redirect(url_for("admin.site_settings"))
 
-        settings = db_session.query(SiteSettings).filter(
-            SiteSettings.setting_name.in_([
-                'main_background_image',
-                'menu_background_image',
-                'admin_panel_background_image',
-                'cart_background_image',
-                'order_history_background_image',
-                'logo_image',
-                'mini_logo_image'
-            ])
-        ).all()
-
-        settings_dict = {setting.setting_name: setting.setting_value for setting in settings}
+        settings_dict = get_site_images().as_dict()
 
-        return render_template("admin/settings.html", settings=settings_dict, t=lambda key: t(key, current_lang), lang=current_lang)
+        return render_template("admin/settings.html", settings=settings_dict)
 
 @bp.route("/users")
 @login_required
 @admin_required
 def users_management():
-    current_lang = session.get('language', 'uk')
-    from app import t
     with Session() as db_session:
         users = db_session.query(User).all()
-        return render_template("admin/users.html", users=users, t=lambda key: t(key, current_lang), lang=current_lang)
+        return render_template("admin/users.html", users=users)
 
 @bp.route("/users/toggle_admin/<int:user_id>", methods=["POST"])
 @login_required
 @admin_required
 def toggle_admin_status(user_id):
-    current_lang = session.get('language', 'uk')
-    from app import t
     if user_id == current_user.id:
         flash( t('Ви не можете забрати адмін права у себе'), "error")
         return redirect(url_for("admin.users_management"))
@@ -251,6 +460,7 @@ def toggle_admin_status(user_id):
         if user:
             user.is_admin = is_admin
             db_session.commit()
+            evict_user(user_id)
             action = "надано" if is_admin else "забрано"
             flash(f"Адмін права {action} користувачу {user.username}!", "success")
         else:
@@ -263,8 +473,6 @@ def toggle_admin_status(user_id):
 @login_required
 @admin_required
 def delete_user(user_id):
-    current_lang = session.get('language', 'uk')
-    from app import t
     if user_id == current_user.id:
         flash( t('Ви не можете видалити себе'), "error")
         return redirect(url_for("admin.users_management"))
@@ -274,9 +482,14 @@ def delete_user(user_id):
 
         if user:
             db_session.query(Order).filter(Order.user_id == user_id).delete()
+            db_session.query(OrderHeader).filter(OrderHeader.user_id == user_id).delete()
+            db_session.query(ArchivedOrder).filter(ArchivedOrder.user_id == user_id).delete()
+            db_session.query(ArchivedOrderHeader).filter(ArchivedOrderHeader.user_id == user_id).delete()
             db_session.query(Reservation).filter(Reservation.user_id == user_id).delete()
             db_session.delete(user)
             db_session.commit()
+            evict_user(user_id)
+            reservation_service.reservation_index.invalidate()
             flash(f"Користувача {user.username} видалено!", "success")
         else:
             flash("Користувача не знайдено", "error")
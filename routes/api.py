@@ -0,0 +1,62 @@
+import json
+
+from flask import Blueprint, current_app, request
+
+from i18n import LANGUAGES, catalog_digests, gettext as t
+from services.catalog import get_catalog
+from services.lru import TTLCache
+
+bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+# Готові JSON-відповіді для пар (версія каталогу, мова)
+_payload_cache = TTLCache(max_size=16, ttl=3600)
+
+
+def _build_payload(catalog, lang):
+    data = {
+        'version': catalog.digest,
+        'lang': lang,
+        'categories': [
+            {'key': category, 'name': t(category, lang)}
+            for category in catalog.categories
+        ],
+        'items': [
+            {
+                'id': item.id,
+                'name': t(item.name, lang),
+                'description': t(item.description, lang) if item.description else None,
+                'price': item.price,
+                'rating': item.rating,
+                'category': item.category,
+                'image': item.image_path,
+            }
+            for item in catalog.items
+        ],
+    }
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _conditional_headers(response, etag):
+    # Без Last-Modified: час перебудови знімка різний у воркерів і змінюється
+    # без змін меню, тож If-Modified-Since давав би то 200, то 304
+    response.set_etag(etag)
+    # Клієнт може зберігати відповідь, але має перевіряти її через ETag
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response
+
+
+@bp.route("/menu")
+def menu():
+    lang = request.args.get("lang", "uk")
+    if lang not in LANGUAGES:
+        lang = "uk"
+
+    catalog = get_catalog()
+    etag = f"{catalog.digest}-{catalog_digests[lang]}-{lang}"
+    if request.if_none_match.contains(etag):
+        return _conditional_headers(current_app.response_class(status=304), etag)
+
+    body = _payload_cache.get_or_load((catalog.digest, lang), lambda key: _build_payload(catalog, lang))
+    response = current_app.response_class(body, mimetype="application/json")
+    return _conditional_headers(response, etag)
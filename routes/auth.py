@@ -1,8 +1,10 @@
-from flask import render_template, request, redirect, url_for, flash, session
+from flask import render_template, request, redirect, url_for, flash
 from models import User
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import login_user, logout_user, login_required, current_user
 from settings import Session
+from i18n import gettext as t
+from services.user_cache import evict_user
 from flask import Blueprint
 import re
 
@@ -25,13 +27,9 @@ def is_valid_password(password):
 @bp.route("/register", methods=["GET", "POST"])
 def register():
     if current_user.is_authenticated:
-        current_lang = session.get('language', 'uk')
-        from app import t
         flash(t('Ви вже авторизовані'), "info")
         return redirect(url_for("index"))
 
-    current_lang = session.get('language', 'uk')
-    from app import t
 
     if request.method == "POST":
         username = request.form.get("username")
@@ -41,9 +39,7 @@ def register():
 
         if not is_valid:
             flash(t(error_message), "error")
-            return render_template("auth/register.html",
-                                   t=lambda key: t(key, current_lang),
-                                   lang=current_lang)
+            return render_template("auth/register.html")
 
         hashed_password = generate_password_hash(password)
         user = User(username=username, email=email, hash_password=hashed_password)
@@ -55,30 +51,23 @@ def register():
                     flash(t('Користувач з таким іменем вже існує'), "error")
                 else:
                     flash(t('Користувач з таким email вже існує'), "error")
-                return render_template("auth/register.html",
-                                       t=lambda key: t(key, current_lang),
-                                       lang=current_lang)
+                return render_template("auth/register.html")
 
             session_db.add(user)
             session_db.commit()
+            evict_user(user.id)
             flash(t('Реєстрація успішна'), "success")
             return redirect(url_for("auth.login"))
 
-    return render_template("auth/register.html",
-                           t=lambda key: t(key, current_lang),
-                           lang=current_lang)
+    return render_template("auth/register.html")
 
 
 @bp.route("/login", methods=["GET", "POST"])
 def login():
     if current_user.is_authenticated:
-        current_lang = session.get('language', 'uk')
-        from app import t
         flash(t('Ви вже авторизовані'), "info")
         return redirect(url_for("index"))
 
-    current_lang = session.get('language', 'uk')
-    from app import t
 
     if request.method == "POST":
         username = request.form.get("username")
@@ -92,16 +81,12 @@ def login():
 
         flash(t('Невірне ім\'я користувача або пароль'), "error")
 
-    return render_template("auth/login.html",
-                           t=lambda key: t(key, current_lang),
-                           lang=current_lang)
+    return render_template("auth/login.html")
 
 
 @bp.route("/logout")
 @login_required
 def logout():
-    current_lang = session.get('language', 'uk')
-    from app import t
 
     logout_user()
     flash(t('Ви вийшли з системи'), "success")
@@ -0,0 +1,32 @@
+import ipaddress
+import os
+
+from flask import Blueprint, Response, abort, request
+
+from services import metrics
+
+bp = Blueprint('metrics', __name__)
+
+# Лише локальний збір: адреси або мережі через кому
+METRICS_ALLOWED_IPS = os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1")
+
+_allowed_networks = tuple(
+    ipaddress.ip_network(entry.strip(), strict=False)
+    for entry in METRICS_ALLOWED_IPS.split(",") if entry.strip()
+)
+
+
+def _is_allowed(address):
+    try:
+        ip = ipaddress.ip_address(address or "")
+    except ValueError:
+        return False
+    return any(ip in network for network in _allowed_networks)
+
+
+@bp.route("/metrics")
+def export():
+    if not _is_allowed(request.remote_addr):
+        abort(403)
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4; charset=utf-8",
+                    headers={"Cache-Control": "no-store"})
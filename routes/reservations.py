@@ -0,0 +1,73 @@
+from datetime import date, datetime, timedelta
+
+from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+from sqlalchemy.exc import OperationalError
+
+from i18n import gettext as t
+from services import reservations as reservation_service
+from settings import Session
+
+bp = Blueprint('reservations', __name__)
+
+
+@bp.route("/reservations")
+@login_required
+def reservations():
+    today = date.today()
+    day = reservation_service.parse_day(request.args.get("date"), today)
+    guests = max(request.args.get("guests", 2, type=int) or 2, 1)
+    now = datetime.now()
+    slots = reservation_service.reservation_index.slots(day, guests, not_before=now) if day >= today else []
+    with Session() as db_session:
+        upcoming = reservation_service.upcoming_for_user(db_session, current_user.id, now)
+    return render_template("reservations.html", day=day, guests=guests, slots=slots, upcoming=upcoming,
+                           today=today,
+                           last_day=today + timedelta(days=reservation_service.RESERVATION_DAYS_AHEAD))
+
+
+def _book(start, guests, notes):
+    """Бронює в окремій транзакції; програна гонка за столик — теж ReservationError"""
+    try:
+        with Session() as db_session:
+            reservation_service.book(db_session, current_user.id, start, guests, notes)
+            db_session.commit()
+    except OperationalError as error:
+        # Паралельне бронювання тримало блокування довше за busy_timeout
+        raise reservation_service.ReservationError(reservation_service.NO_FREE_TABLES) from error
+
+
+@bp.route("/reservations", methods=["POST"])
+@login_required
+def book_table():
+    guests = request.form.get("guests", 0, type=int)
+    try:
+        start = datetime.fromisoformat(request.form.get("start", ""))
+    except ValueError:
+        start = None
+    back = url_for("reservations.reservations", date=start.date().isoformat() if start else None, guests=guests)
+    if start is None:
+        flash(t('Оберіть один із запропонованих слотів'), "error")
+        return redirect(back)
+
+    try:
+        _book(start, guests, request.form.get("notes", "").strip())
+    except reservation_service.ReservationError as error:
+        flash(t(str(error)), "error")
+        return redirect(back)
+
+    flash(f"{t('Столик заброньовано')}: {start.strftime('%d.%m.%Y %H:%M')}", "success")
+    return redirect(back)
+
+
+@bp.route("/reservations/<int:reservation_id>/cancel", methods=["POST"])
+@login_required
+def cancel_reservation(reservation_id):
+    with Session() as db_session:
+        cancelled = reservation_service.cancel(db_session, reservation_id, user_id=current_user.id)
+        db_session.commit()
+    if cancelled:
+        flash(t('Бронювання скасовано'), "success")
+    else:
+        flash(t('Бронювання не знайдено'), "error")
+    return redirect(url_for("reservations.reservations"))
@@ -0,0 +1,380 @@
+"""Генератор синтетичних даних великого обсягу.
+
+Без запитань, з параметрами командного рядка; дані вставляються
+пакетами через Core executemany, кожен пакет — окрема транзакція.
+Замовлення розподілені в часі з піками на обід і вечерю, статуси
+залежать від віку замовлення, а популярність страв і активність
+клієнтів нерівномірні, як у реальних даних.
+
+    python3 seed_data.py --users 50000 --menu-items 300 --orders 1000000 --reservations 50000 --tables 40
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from sqlalchemy import event, func, insert, select, text
+from werkzeug.security import generate_password_hash
+
+from migrate_db import upgrade
+from models import ArchivedOrder, ArchivedOrderHeader, Base, DiningTable, Menu, Order, OrderHeader, OrderStatus, Reservation, User
+from services.reservations import RESERVATION_DURATION_MINUTES, DayIndex, TableInfo, slot_starts
+from settings import get_engine
+
+SEED_PASSWORD = "SeedUser123!"
+CATEGORIES = ("Роли", "Запечені роли", "Спайсі роли", "Сети", "Суші", "Гункани",
+              "Сашимі", "Супи", "Гарячі страви", "Напої", "Десерти")
+DISH_WORDS = ("Філадельфія", "Каліфорнія", "Дракон", "Боніто", "Унагі", "Тунець", "Лосось",
+              "Креветка", "Авокадо", "Темпура", "Футомакі", "Місо", "Том ям", "Рамен", "Мочі")
+FILLINGS = ("з лососем", "з вугрем", "з тунцем", "з креветкою", "з крабом", "з авокадо",
+            "з огірком", "з ікрою масаго", "з вершковим сиром", "з кунжутом")
+
+# Години замовлень: пік на обід і вечерю
+HOUR_WEIGHTS = (0, 0, 0, 0, 0, 0, 0, 1, 2, 3, 4, 7, 12, 13, 9, 5, 5, 8, 13, 14, 11, 7, 4, 1)
+
+# Статуси залежно від віку замовлення
+RECENT_STATUSES = ((OrderStatus.CONFIRMED, 30), (OrderStatus.PREPARING, 30), (OrderStatus.READY, 10),
+                   (OrderStatus.DELIVERING, 15), (OrderStatus.COMPLETED, 10), (OrderStatus.CANCELLED, 5))
+TODAY_STATUSES = ((OrderStatus.DELIVERING, 3), (OrderStatus.COMPLETED, 85), (OrderStatus.CANCELLED, 12))
+OLD_STATUSES = ((OrderStatus.COMPLETED, 91), (OrderStatus.CANCELLED, 9))
+RESERVATION_STATUSES = (("confirmed", 70), ("pending", 15), ("cancelled", 15))
+# Бронювання за днями тижня (понеділок — 0): пік у п'ятницю та суботу
+WEEKDAY_WEIGHTS = (2, 2, 2, 3, 6, 7, 4)
+TABLE_SEATS = (2, 2, 2, 4, 4, 4, 6, 8)
+
+INDEXED_TABLES = (Order.__table__, OrderHeader.__table__, Reservation.__table__)
+
+
+class Progress:
+    """Рядок прогресу в stderr, оновлюється не частіше ніж раз на 0,2 с"""
+
+    def __init__(self, label, total):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.started = time.perf_counter()
+        self._shown = 0.0
+
+    def advance(self, count):
+        self.done += count
+        now = time.perf_counter()
+        if now - self._shown >= 0.2 or self.done >= self.total:
+            self._shown = now
+            rate = self.done / max(now - self.started, 1e-9)
+            percent = self.done * 100 / self.total if self.total else 100
+            sys.stderr.write(f"\r[{self.label}] {self.done:,}/{self.total:,} ({percent:.0f}%) {rate:,.0f} рядків/с")
+            sys.stderr.flush()
+
+    def finish(self):
+        elapsed = time.perf_counter() - self.started
+        sys.stderr.write(f"\r[{self.label}] {self.done:,} рядків за {elapsed:.1f} с{' ' * 20}\n")
+
+
+def _next_id(connection, table, *archives):
+    """Перший вільний id; архівні таблиці теж враховуються, щоб id не повторились"""
+    return max(connection.execute(select(func.max(source.c.id))).scalar() or 0
+               for source in (table, *archives)) + 1
+
+
+def _sync_sequence(engine, table):
+    """Явні id не зсувають послідовність Postgres — інакше наступна вставка впаде на дублікаті ключа"""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as connection:
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), (SELECT max(id) FROM {table.name}))"
+        ))
+
+
+def _weighted(pairs):
+    values = [value for value, _ in pairs]
+    cumulative = list(accumulate(weight for _, weight in pairs))
+    return values, cumulative
+
+
+def _skewed_weights(count, exponent=1.1):
+    """Ваги за законом Ципфа: небагато популярних і довгий хвіст"""
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def _insert_batches(engine, table, rows, total, batch_size, label):
+    progress = Progress(label, total)
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            with engine.begin() as connection:
+                connection.execute(insert(table), batch)
+            progress.advance(len(batch))
+            batch = []
+    if batch:
+        with engine.begin() as connection:
+            connection.execute(insert(table), batch)
+        progress.advance(len(batch))
+    progress.finish()
+
+
+def seed_users(engine, rng, count, batch_size):
+    with engine.connect() as connection:
+        first_id = _next_id(connection, User.__table__)
+    password_hash = generate_password_hash(SEED_PASSWORD)
+    rows = ({"id": user_id, "username": f"user_{user_id}", "email": f"user_{user_id}@example.com",
+             "hash_password": password_hash, "is_admin": False}
+            for user_id in range(first_id, first_id + count))
+    _insert_batches(engine, User.__table__, rows, count, batch_size, "users")
+    _sync_sequence(engine, User.__table__)
+    return list(range(first_id, first_id + count))
+
+
+def seed_menu(engine, rng, count, batch_size):
+    with engine.connect() as connection:
+        first_id = _next_id(connection, Menu.__table__)
+    rows = ({"id": item_id,
+             "name": f"{rng.choice(DISH_WORDS)} {rng.choice(FILLINGS)} №{item_id}",
+             "price": rng.randrange(60, 1200, 5),
+             "rating": rng.choices((3, 4, 5), (1, 4, 5))[0],
+             "description": f"{rng.choice(DISH_WORDS)}, {rng.choice(FILLINGS)}, рис, норі",
+             "image_path": "",
+             "category": rng.choice(CATEGORIES),
+             "active": rng.random() > 0.05}
+            for item_id in range(first_id, first_id + count))
+    _insert_batches(engine, Menu.__table__, rows, count, batch_size, "menu")
+    _sync_sequence(engine, Menu.__table__)
+
+
+def _order_time(rng, now, days):
+    day = now.date() - timedelta(days=min(int(rng.expovariate(1 / (days / 3))), days - 1))
+    hour = rng.choices(range(24), HOUR_WEIGHTS)[0]
+    moment = datetime.combine(day, datetime.min.time()) + timedelta(hours=hour, seconds=rng.randrange(3600))
+    return min(moment, now - timedelta(seconds=rng.randrange(1, 600)))
+
+
+def _order_status(rng, age, tables):
+    if age < timedelta(hours=2):
+        values, cumulative = tables["recent"]
+    elif age < timedelta(days=1):
+        values, cumulative = tables["today"]
+    else:
+        values, cumulative = tables["old"]
+    return rng.choices(values, cum_weights=cumulative)[0]
+
+
+def seed_orders(engine, rng, count, batch_size, days, user_ids, max_lines):
+    """Заголовки замовлень і їхні рядки; ідентифікатори призначаються наперед"""
+    with engine.connect() as connection:
+        menu = connection.execute(select(Menu.id, Menu.price).where(Menu.active.is_(True))).all()
+        header_id = _next_id(connection, OrderHeader.__table__, ArchivedOrderHeader.__table__)
+        line_id = _next_id(connection, Order.__table__, ArchivedOrder.__table__)
+    if not menu or not user_ids:
+        raise SystemExit("Для замовлень потрібні користувачі та активні страви")
+
+    rng.shuffle(menu)
+    menu_weights = _skewed_weights(len(menu))
+    shuffled_users = list(user_ids)
+    rng.shuffle(shuffled_users)
+    user_weights = _skewed_weights(len(shuffled_users), exponent=0.8)
+    status_tables = {"recent": _weighted(RECENT_STATUSES), "today": _weighted(TODAY_STATUSES),
+                     "old": _weighted(OLD_STATUSES)}
+    now = datetime.now()
+
+    progress = Progress("orders", count)
+    remaining = count
+    while remaining:
+        size = min(batch_size, remaining)
+        headers, lines = [], []
+        for user_id in rng.choices(shuffled_users, cum_weights=user_weights, k=size):
+            created_at = _order_time(rng, now, days)
+            status = _order_status(rng, now - created_at, status_tables)
+            items = rng.choices(menu, cum_weights=menu_weights, k=rng.randint(1, max_lines))
+            total, quantity_sum = 0.0, 0
+            for menu_id, price in items:
+                quantity = rng.choices((1, 2, 3, 4), (70, 20, 7, 3))[0]
+                lines.append({"id": line_id, "user_id": user_id, "menu_id": menu_id,
+                              "header_id": header_id, "quantity": quantity,
+                              "status": OrderStatus.CONFIRMED, "created_at": created_at,
+                              "total_price": price * quantity})
+                line_id += 1
+                total += price * quantity
+                quantity_sum += quantity
+            updated_at = created_at + timedelta(minutes=rng.randint(0, 90)) if status is not OrderStatus.CONFIRMED else created_at
+            headers.append({"id": header_id, "user_id": user_id, "status": status,
+                            "total_price": total, "items_count": quantity_sum,
+                            "created_at": created_at, "updated_at": min(updated_at, now)})
+            header_id += 1
+        with engine.begin() as connection:
+            connection.execute(insert(OrderHeader), headers)
+            connection.execute(insert(Order), lines)
+        remaining -= size
+        progress.advance(size)
+    progress.finish()
+    _sync_sequence(engine, OrderHeader.__table__)
+    _sync_sequence(engine, Order.__table__)
+
+
+def seed_carts(engine, rng, count, user_ids, batch_size):
+    """Незавершені кошики: рядки PENDING без заголовка, по одному кошику на користувача"""
+    with engine.connect() as connection:
+        menu = connection.execute(select(Menu.id, Menu.price).where(Menu.active.is_(True))).all()
+    now = datetime.now()
+    rows = []
+    for user_id in rng.sample(user_ids, min(count, len(user_ids))):
+        for menu_id, price in rng.sample(menu, min(rng.randint(1, 4), len(menu))):
+            quantity = rng.randint(1, 2)
+            rows.append({"user_id": user_id, "menu_id": menu_id, "header_id": None,
+                         "quantity": quantity, "status": OrderStatus.PENDING,
+                         "created_at": now - timedelta(minutes=rng.randrange(60 * 24 * 3)),
+                         "total_price": price * quantity})
+    _insert_batches(engine, Order.__table__, iter(rows), len(rows), batch_size, "carts")
+
+
+def seed_tables(engine, count, batch_size):
+    with engine.connect() as connection:
+        first_id = _next_id(connection, DiningTable.__table__)
+    rows = ({"id": table_id, "name": f"Столик {table_id}", "seats": TABLE_SEATS[index % len(TABLE_SEATS)],
+             "active": True}
+            for index, table_id in enumerate(range(first_id, first_id + count)))
+    _insert_batches(engine, DiningTable.__table__, rows, count, batch_size, "tables")
+    _sync_sequence(engine, DiningTable.__table__)
+
+
+def seed_reservations(engine, rng, count, batch_size, days, user_ids):
+    """Бронювання зі столиком і часом завершення, без перетинів на одному столику.
+
+    Столик підбирається тим самим DayIndex, що й у застосунку: найменший
+    вільний, де вистачає місць. Вихідні й вечори популярніші, тож у
+    пікові дні столики закінчуються, а запити без вільного столика
+    пропускаються — як відмови реальним гостям.
+    """
+    with engine.connect() as connection:
+        tables = [TableInfo(id=row.id, name=row.name, seats=row.seats) for row in connection.execute(
+            select(DiningTable.id, DiningTable.name, DiningTable.seats).where(DiningTable.active.is_(True))
+        )]
+    if not tables:
+        raise SystemExit("Для бронювань потрібні столики (--tables)")
+    values, cumulative = _weighted(RESERVATION_STATUSES)
+    today = datetime.now().date()
+    offsets = range(-days, 15)
+    # Переважно минулі бронювання, частина — на два тижні вперед; п'ятниця й субота — пік
+    day_weights = list(accumulate(WEEKDAY_WEIGHTS[(today + timedelta(days=offset)).weekday()] for offset in offsets))
+    duration = timedelta(minutes=RESERVATION_DURATION_MINUTES)
+    max_seats = max(table.seats for table in tables)
+    schedules = {}
+    skipped = 0
+
+    def rows():
+        nonlocal skipped
+        for number in range(count):
+            offset = rng.choices(offsets, cum_weights=day_weights)[0]
+            day = today + timedelta(days=offset)
+            starts = list(slot_starts(day))
+            start = rng.choices(starts, [HOUR_WEIGHTS[slot.hour] for slot in starts])[0]
+            guests = min(rng.choices((1, 2, 3, 4, 5, 6, 8), (5, 40, 15, 20, 8, 8, 4))[0], max_seats)
+            status = rng.choices(values, cum_weights=cumulative)[0]
+            if offset < 0 and status == "pending":
+                status = "confirmed"
+            index = schedules.get(day)
+            if index is None:
+                index = schedules[day] = DayIndex(day, tables)
+            free = index.free_tables(start, start + duration, guests)
+            if not free:
+                skipped += 1
+                continue
+            if status != "cancelled":
+                index.add(number, free[0].id, start, start + duration)
+            yield {"user_id": rng.choice(user_ids), "table_id": free[0].id, "time_start": start,
+                   "time_end": start + duration, "guests": guests, "notes": None, "status": status}
+
+    _insert_batches(engine, Reservation.__table__, rows(), count, batch_size, "reservations")
+    if skipped:
+        sys.stderr.write(f"[reservations] без вільного столика пропущено: {skipped:,}\n")
+
+
+def drop_indexes(engine):
+    """Вторинні індекси перебудовуються після вставки — так значно швидше"""
+    with engine.begin() as connection:
+        for table in INDEXED_TABLES:
+            for index in table.indexes:
+                index.drop(connection, checkfirst=True)
+
+
+def create_indexes(engine):
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        for table in INDEXED_TABLES:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+        if connection.dialect.name == "sqlite":
+            connection.execute(text("ANALYZE"))
+    sys.stderr.write(f"[indexes] перебудовано за {time.perf_counter() - started:.1f} с\n")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Генерація синтетичних даних для бази ресторану")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--menu-items", type=int, default=100)
+    parser.add_argument("--orders", type=int, default=10000, help="кількість замовлень (заголовків)")
+    parser.add_argument("--max-lines", type=int, default=5, help="максимум страв в одному замовленні")
+    parser.add_argument("--carts", type=int, default=None, help="незавершених кошиків (за замовчуванням 5%% користувачів)")
+    parser.add_argument("--reservations", type=int, default=1000)
+    parser.add_argument("--tables", type=int, default=None,
+                        help="столиків для бронювань (за замовчуванням 20, якщо столиків ще немає)")
+    parser.add_argument("--days", type=int, default=365, help="глибина історії в днях")
+    parser.add_argument("--seed", type=int, default=None, help="зерно генератора для відтворюваних даних")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--reset", action="store_true", help="видалити всі таблиці перед генерацією")
+    parser.add_argument("--keep-indexes", action="store_true",
+                        help="не перебудовувати індекси (повільніше для великих обсягів)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+    engine = get_engine()
+    started = time.perf_counter()
+
+    if args.reset:
+        Base.metadata.drop_all(engine)
+    upgrade()
+
+    if engine.dialect.name == "sqlite":
+        # Швидкість заповнення важливіша за стійкість до збою живлення
+        @event.listens_for(engine, "connect")
+        def _fast_pragmas(dbapi_connection, connection_record):
+            dbapi_connection.execute("PRAGMA synchronous=OFF")
+        engine.dispose()
+
+    bulk = args.orders + args.reservations >= 100_000 and not args.keep_indexes
+    if bulk:
+        drop_indexes(engine)
+
+    user_ids = seed_users(engine, rng, args.users, args.batch_size) if args.users else []
+    if not user_ids:
+        with engine.connect() as connection:
+            user_ids = list(connection.execute(select(User.id).where(User.is_admin.is_(False))).scalars())
+    if args.menu_items:
+        seed_menu(engine, rng, args.menu_items, args.batch_size)
+    if args.orders:
+        seed_orders(engine, rng, args.orders, args.batch_size, args.days, user_ids, args.max_lines)
+    carts = args.carts if args.carts is not None else len(user_ids) // 20
+    if carts and user_ids:
+        seed_carts(engine, rng, carts, user_ids, args.batch_size)
+    tables = args.tables
+    if tables is None:
+        with engine.connect() as connection:
+            tables = 0 if connection.execute(select(DiningTable.id).limit(1)).first() else 20
+    if tables:
+        seed_tables(engine, tables, args.batch_size)
+    if args.reservations and user_ids:
+        seed_reservations(engine, rng, args.reservations, args.batch_size, args.days, user_ids)
+
+    if bulk:
+        create_indexes(engine)
+
+    print(f"Готово за {time.perf_counter() - started:.1f} с. Пароль згенерованих користувачів: {SEED_PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Архівація завершених замовлень (COMPLETED, CANCELLED) у окремі таблиці.
+
+Замовлення, старші за ORDER_ARCHIVE_AFTER_DAYS, переносяться пачками:
+кожна пачка — одна транзакція з INSERT ... SELECT у order_headers_archive
+та orders_archive і DELETE з робочих таблиць, тож у order_headers і
+orders лишаються лише живі замовлення. Id зберігаються, а історія
+користувача (services.order_history) читає обидві таблиці.
+
+Робочі таблиці мають AUTOINCREMENT (у Postgres — послідовності), тож
+перенесені id ніколи не видаються новим замовленням. Для живої дошки
+подій не пишемо — архівуються лише давно завершені замовлення, яких
+немає в черзі кухні.
+"""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, literal, select
+
+from models import ArchivedOrder, ArchivedOrderHeader, Menu, Order, OrderHeader
+from services.orders import FINAL_STATUSES
+from settings import Session
+
+ORDER_ARCHIVE_AFTER_DAYS = int(os.getenv("ORDER_ARCHIVE_AFTER_DAYS", "90"))
+ORDER_ARCHIVE_BATCH_SIZE = int(os.getenv("ORDER_ARCHIVE_BATCH_SIZE", "1000"))
+
+
+def default_cutoff(days=ORDER_ARCHIVE_AFTER_DAYS):
+    return datetime.now() - timedelta(days=days)
+
+
+def _archivable(cutoff):
+    return OrderHeader.status.in_(FINAL_STATUSES), OrderHeader.created_at < cutoff
+
+
+def count_archivable(db_session, cutoff):
+    return db_session.execute(select(func.count()).select_from(OrderHeader).where(*_archivable(cutoff))).scalar()
+
+
+def archive_batch(db_session, cutoff, batch_size=ORDER_ARCHIVE_BATCH_SIZE):
+    """Переносить до batch_size найстаріших замовлень; повертає їх кількість (без коміту)"""
+    header_ids = db_session.scalars(
+        select(OrderHeader.id).where(*_archivable(cutoff))
+        .order_by(OrderHeader.created_at, OrderHeader.id)
+        .limit(batch_size)
+    ).all()
+    if not header_ids:
+        return 0
+
+    db_session.execute(insert(ArchivedOrderHeader).from_select(
+        ["id", "user_id", "status", "total_price", "items_count", "created_at", "updated_at", "archived_at"],
+        select(OrderHeader.id, OrderHeader.user_id, OrderHeader.status, OrderHeader.total_price,
+               OrderHeader.items_count, OrderHeader.created_at,
+               func.coalesce(OrderHeader.updated_at, OrderHeader.created_at), literal(datetime.now()))
+        # Статус перевіряється ще раз: замовлення могли повернути в роботу після вибірки
+        .where(OrderHeader.id.in_(header_ids), OrderHeader.status.in_(FINAL_STATUSES)),
+    ))
+    archived = select(ArchivedOrderHeader.id).where(ArchivedOrderHeader.id.in_(header_ids))
+    db_session.execute(insert(ArchivedOrder).from_select(
+        ["id", "header_id", "user_id", "menu_id", "menu_name", "quantity", "total_price", "created_at"],
+        select(Order.id, Order.header_id, Order.user_id, Order.menu_id, Menu.name, Order.quantity,
+               Order.total_price, Order.created_at)
+        .outerjoin(Menu, Menu.id == Order.menu_id)
+        .where(Order.header_id.in_(archived)),
+    ))
+    db_session.execute(
+        delete(Order).where(Order.header_id.in_(archived))
+        .execution_options(synchronize_session=False)
+    )
+    return db_session.execute(
+        delete(OrderHeader).where(OrderHeader.id.in_(archived))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def archive_closed_orders(cutoff=None, batch_size=ORDER_ARCHIVE_BATCH_SIZE, on_batch=None):
+    """Архівує пачками до вичерпання; кожна пачка комітиться окремо.
+
+    Короткі транзакції не тримають блокування бази надовго, тож
+    замовлення приймаються й під час архівації. Повертає кількість
+    перенесених замовлень.
+    """
+    cutoff = cutoff or default_cutoff()
+    total = 0
+    while True:
+        with Session() as db_session:
+            moved = archive_batch(db_session, cutoff, batch_size)
+            db_session.commit()
+        total += moved
+        if on_batch is not None and moved:
+            on_batch(moved, total)
+        if moved < batch_size:
+            return total
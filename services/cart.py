@@ -0,0 +1,141 @@
+"""Кошик користувача: рядки та підсумки, пораховані в базі.
+
+Підсумок кошика кешується для кожного користувача, щоб бейдж кошика
+в навігації не коштував запиту на кожній сторінці. Кеш оновлюється
+при додаванні, зміні кількості, видаленні та оформленні замовлення, але
+лише у воркері, що обробив зміну, тому час життя запису короткий: інші
+воркери показують застарілий бейдж не довше CART_CACHE_TTL секунд.
+"""
+import os
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import delete, func, insert, literal, select, update
+
+from models import Menu, Order, OrderStatus
+from services.lru import TTLCache
+from services.metrics import count_on_commit
+from settings import Session
+
+
+@dataclass(frozen=True, slots=True)
+class CartLine:
+    id: int
+    menu_id: int
+    name: str
+    description: str | None
+    image_path: str | None
+    quantity: int
+    total_price: float
+
+
+@dataclass(frozen=True, slots=True)
+class CartSummary:
+    lines: tuple
+    items_count: int
+    total: float
+
+    def __bool__(self):
+        return bool(self.lines)
+
+
+EMPTY_CART = CartSummary(lines=(), items_count=0, total=0.0)
+
+_cart_cache = TTLCache(
+    max_size=int(os.getenv("CART_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("CART_CACHE_TTL", "5")),
+)
+
+
+def _cart_filter(user_id):
+    return (Order.user_id == user_id,
+            Order.status == OrderStatus.PENDING,
+            Order.header_id.is_(None))
+
+
+def load_cart(db_session, user_id) -> CartSummary:
+    """Один запит: рядки кошика з даними страв і підсумки через віконні функції"""
+    rows = db_session.execute(
+        select(
+            Order.id, Order.menu_id, Menu.name, Menu.description, Menu.image_path,
+            Order.quantity, Order.total_price,
+            func.sum(Order.quantity).over(),
+            func.sum(Order.total_price).over(),
+        )
+        .join(Menu, Menu.id == Order.menu_id)
+        .where(*_cart_filter(user_id))
+        .order_by(Order.id)
+    ).all()
+    if not rows:
+        return EMPTY_CART
+    return CartSummary(
+        lines=tuple(CartLine(*row[:7]) for row in rows),
+        items_count=rows[0][7] or 0,
+        total=rows[0][8] or 0.0,
+    )
+
+
+def get_cart(user_id, fresh=False) -> CartSummary:
+    summary = None if fresh else _cart_cache.get(user_id)
+    if summary is None:
+        with Session() as db_session:
+            summary = load_cart(db_session, user_id)
+        _cart_cache.set(user_id, summary)
+    return summary
+
+
+def invalidate_cart(user_id):
+    _cart_cache.evict(user_id)
+
+
+def mark_cart_empty(user_id):
+    """Після оформлення кошик гарантовано порожній — запит не потрібен"""
+    _cart_cache.set(user_id, EMPTY_CART)
+
+
+def add_item(db_session, user_id, menu_id, quantity):
+    """Додає страву до кошика одним UPDATE або INSERT ... SELECT.
+
+    Ціна й активність страви читаються з меню в тому самому запиті, а
+    не зі знімка каталогу, який у воркері може бути застарілим. Повертає
+    False, якщо страву вимкнули чи видалили.
+    """
+    price = select(Menu.price).where(Menu.id == menu_id, Menu.active.is_(True)).scalar_subquery()
+    added = db_session.execute(
+        update(Order)
+        .where(*_cart_filter(user_id), Order.menu_id == menu_id, price.is_not(None))
+        .values(quantity=Order.quantity + quantity,
+                total_price=(Order.quantity + quantity) * price)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not added:
+        added = db_session.execute(insert(Order).from_select(
+            ["user_id", "menu_id", "quantity", "total_price", "status", "created_at"],
+            select(literal(user_id), Menu.id, literal(quantity), Menu.price * quantity,
+                   literal(OrderStatus.PENDING, Order.__table__.c.status.type), literal(datetime.now()))
+            .where(Menu.id == menu_id, Menu.active.is_(True)),
+        )).rowcount
+    if added:
+        count_on_commit(db_session, "restaurant_cart_additions_total")
+    return bool(added)
+
+
+def set_quantity(db_session, user_id, order_id, quantity):
+    """Змінює кількість рядка кошика (0 — видаляє); повертає кількість змінених рядків"""
+    if quantity <= 0:
+        return remove_line(db_session, user_id, order_id)
+    price = select(Menu.price).where(Menu.id == Order.menu_id).scalar_subquery()
+    return db_session.execute(
+        update(Order)
+        .where(*_cart_filter(user_id), Order.id == order_id)
+        .values(quantity=quantity, total_price=price * quantity)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def remove_line(db_session, user_id, order_id):
+    return db_session.execute(
+        delete(Order)
+        .where(*_cart_filter(user_id), Order.id == order_id)
+        .execution_options(synchronize_session=False)
+    ).rowcount
@@ -0,0 +1,75 @@
+"""Знімок активного меню, спільний для всіх маршрутів меню.
+
+Знімок незмінний і перебудовується лише після того, як адмінка
+закомітила зміну страви (add/edit/delete викликають invalidate_catalog).
+"""
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from models import Menu
+from services.versioned import VersionedCache
+from settings import Session
+
+
+@dataclass(frozen=True, slots=True)
+class MenuItemView:
+    """Компактний від'єднаний запис страви"""
+    id: int
+    name: str
+    price: float
+    rating: int | None
+    description: str | None
+    image_path: str | None
+    category: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogSnapshot:
+    version: int
+    built_at: float
+    digest: str
+    items: tuple
+    categories: tuple
+    by_id: MappingProxyType
+    by_category: MappingProxyType
+
+    def get(self, item_id):
+        return self.by_id.get(item_id)
+
+
+def _build_snapshot():
+    with Session() as db_session:
+        rows = db_session.query(
+            Menu.id, Menu.name, Menu.price, Menu.rating,
+            Menu.description, Menu.image_path, Menu.category
+        ).filter(Menu.active == True).order_by(Menu.id).all()
+
+    items = tuple(MenuItemView(*row) for row in rows)
+    by_category = {}
+    for item in items:
+        if item.category:
+            by_category.setdefault(item.category, []).append(item)
+    return CatalogSnapshot(
+        version=catalog_cache.version,
+        built_at=time.time(),
+        # Хеш вмісту однаковий у всіх воркерах, на відміну від лічильника версій
+        digest=hashlib.sha256(repr(items).encode()).hexdigest()[:20],
+        items=items,
+        categories=tuple(sorted(by_category)),
+        by_id=MappingProxyType({item.id: item for item in items}),
+        by_category=MappingProxyType({name: tuple(group) for name, group in by_category.items()}),
+    )
+
+
+catalog_cache = VersionedCache(_build_snapshot, max_age=int(os.getenv("MENU_CACHE_TTL", "300")))
+
+
+def get_catalog() -> CatalogSnapshot:
+    return catalog_cache.get()
+
+
+def invalidate_catalog():
+    catalog_cache.invalidate()
@@ -0,0 +1,82 @@
+"""Статистика для панелі адміністратора.
+
+Лічильники за статусами та виручка за сьогодні рахуються одним
+згрупованим запитом по order_headers; кількість страв береться зі
+знімка каталогу. Результат коротко кешується, бо панель автоматично
+оновлюється на кількох екранах персоналу одночасно.
+
+До підсумків додаються замовлення з order_headers_archive, інакше після
+archive_orders.py вони б зменшились. Архів змінюється лише під час
+архівації, тож його агрегат кешується за ключем max(archived_at) — це
+один крок по індексу, і нова пачка архіву одразу дає новий ключ.
+"""
+import os
+from dataclasses import dataclass
+from datetime import datetime, time
+from types import MappingProxyType
+
+from sqlalchemy import case, func, select
+
+from models import ArchivedOrderHeader, OrderHeader, OrderStatus
+from services.catalog import get_catalog
+from services.lru import TTLCache
+from settings import Session
+
+_stats_cache = TTLCache(max_size=1, ttl=float(os.getenv("DASHBOARD_CACHE_TTL", "5")))
+_archive_cache = TTLCache(max_size=2, ttl=float(os.getenv("DASHBOARD_ARCHIVE_CACHE_TTL", "3600")))
+
+
+@dataclass(frozen=True, slots=True)
+class DashboardStats:
+    status_counts: MappingProxyType
+    total_orders: int
+    orders_today: int
+    revenue_today: float
+    active_menu_items: int
+
+    @property
+    def pending_orders(self):
+        """Оформлені замовлення, які ще не взяли в роботу"""
+        return self.status_counts[OrderStatus.CONFIRMED]
+
+
+def _totals(db_session, model, today):
+    """[(статус, кількість, сьогодні, виручка сьогодні)] одним згрупованим запитом"""
+    is_today = model.created_at >= today
+    return db_session.execute(select(
+        model.status,
+        func.count(),
+        func.sum(case((is_today, 1), else_=0)),
+        func.sum(case((is_today & (model.status != OrderStatus.CANCELLED), model.total_price), else_=0)),
+    ).group_by(model.status)).all()
+
+
+def _archived_totals(db_session, today):
+    last_archived = db_session.execute(select(func.max(ArchivedOrderHeader.archived_at))).scalar()
+    return _archive_cache.get_or_load((today, last_archived),
+                                      lambda key: _totals(db_session, ArchivedOrderHeader, today))
+
+
+def _load_stats(_key=None):
+    today = datetime.combine(datetime.now().date(), time.min)
+    counts = dict.fromkeys(OrderStatus, 0)
+    orders_today = 0
+    revenue_today = 0.0
+    with Session() as db_session:
+        rows = _totals(db_session, OrderHeader, today) + _archived_totals(db_session, today)
+    for status, count, today_count, today_revenue in rows:
+        counts[status] += count
+        orders_today += today_count or 0
+        revenue_today += today_revenue or 0
+
+    return DashboardStats(
+        status_counts=MappingProxyType(counts),
+        total_orders=sum(counts.values()),
+        orders_today=orders_today,
+        revenue_today=revenue_today,
+        active_menu_items=len(get_catalog().items),
+    )
+
+
+def get_dashboard_stats() -> DashboardStats:
+    return _stats_cache.get_or_load("stats", _load_stats)
@@ -0,0 +1,164 @@
+"""Локальні зображення: завантаження, адаптивні варіанти та srcset.
+
+Завантажений файл перевіряється Pillow і зменшується до кількох ширин
+свого профілю (картка меню, фон, логотип) у вихідному форматі (JPEG або
+PNG для прозорих) та у WebP. Імена файлів містять хеш вмісту, тож
+варіанти незмінні, повторне завантаження того ж файлу нічого не пише, а
+кешувати їх браузер може назавжди. Поруч лежить маніфест {digest}.json
+зі списком ширин; у базі зберігається URL найбільшого варіанту.
+
+Зовнішні URL (старі посилання) працюють як раніше, але без srcset.
+"""
+import functools
+import hashlib
+import io
+import json
+import os
+import re
+from dataclasses import dataclass
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UPLOAD_DIR = os.getenv("IMAGE_UPLOAD_DIR", os.path.join(ROOT, "static", "uploads"))
+UPLOAD_URL = "/static/uploads/"
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", str(10 * 1024 * 1024)))
+MAX_IMAGE_PIXELS = 40_000_000
+
+# Ширини варіантів для кожного призначення
+PROFILES = {
+    "menu": (320, 640, 960),
+    "background": (960, 1600, 2560),
+    "logo": (64, 128, 256, 512),
+}
+SETTING_PROFILES = {"logo_image": "logo", "mini_logo_image": "logo"}
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP"}
+JPEG_QUALITY = 82
+WEBP_QUALITY = 78
+
+_LOCAL_NAME = re.compile(r"^/static/uploads/(?P<digest>[0-9a-f]{16})-\d+\.(?:jpg|png)$")
+
+
+class ImageError(ValueError):
+    """Файл не є підтримуваним зображенням"""
+
+
+@dataclass(frozen=True, slots=True)
+class ImageVariants:
+    src: str
+    width: int
+    height: int
+    srcset: str
+    webp_srcset: str
+
+
+def profile_for_setting(setting_name):
+    return SETTING_PROFILES.get(setting_name, "background")
+
+
+def _target_widths(original_width, profile):
+    widths = PROFILES[profile]
+    largest = min(original_width, widths[-1])
+    return sorted({width for width in widths if width < largest} | {largest})
+
+
+def _write_atomic(path, data):
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as handle:
+        handle.write(data)
+    os.replace(temporary, path)
+
+
+def _encode(image, image_format, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def store_image(data, profile="menu"):
+    """Зберігає варіанти зображення та повертає URL для бази"""
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    if len(data) > MAX_IMAGE_BYTES:
+        raise ImageError("Файл зображення завеликий")
+    digest = hashlib.sha256(profile.encode() + data).hexdigest()[:16]
+    manifest_path = os.path.join(UPLOAD_DIR, f"{digest}.json")
+    if os.path.exists(manifest_path):
+        return _manifest(digest).src
+
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    try:
+        with Image.open(io.BytesIO(data)) as probe:
+            probe.verify()
+        image = Image.open(io.BytesIO(data))
+        if image.format not in ALLOWED_FORMATS:
+            raise ImageError("Підтримуються лише JPEG, PNG та WebP")
+        image = ImageOps.exif_transpose(image)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as error:
+        raise ImageError("Файл не є коректним зображенням") from error
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    extension = "png" if has_alpha else "jpg"
+
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    widths = _target_widths(image.width, profile)
+    for width in widths:
+        height = max(round(image.height * width / image.width), 1)
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        if has_alpha:
+            fallback = _encode(resized, "PNG", optimize=True)
+        else:
+            fallback = _encode(resized, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        _write_atomic(os.path.join(UPLOAD_DIR, f"{digest}-{width}.{extension}"), fallback)
+        _write_atomic(os.path.join(UPLOAD_DIR, f"{digest}-{width}.webp"),
+                      _encode(resized, "WEBP", quality=WEBP_QUALITY, method=4))
+
+    largest = widths[-1]
+    manifest = {"widths": widths, "format": extension, "width": largest,
+                "height": max(round(image.height * largest / image.width), 1)}
+    # Маніфест пишеться останнім: його поява означає, що всі варіанти на диску
+    _write_atomic(manifest_path, json.dumps(manifest).encode())
+    return f"{UPLOAD_URL}{digest}-{largest}.{extension}"
+
+
+def store_upload(file_storage, profile="menu"):
+    """Зберігає завантажений файл форми; None, якщо файл не вибрано"""
+    if file_storage is None or not file_storage.filename:
+        return None
+    return store_image(file_storage.read(MAX_IMAGE_BYTES + 1), profile)
+
+
+@functools.lru_cache(maxsize=4096)
+def _manifest(digest):
+    # Варіанти незмінні, тож маніфест можна кешувати без інвалідації
+    try:
+        with open(os.path.join(UPLOAD_DIR, f"{digest}.json"), encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    extension = manifest["format"]
+    widths = manifest["widths"]
+    return ImageVariants(
+        src=f"{UPLOAD_URL}{digest}-{widths[-1]}.{extension}",
+        width=manifest["width"],
+        height=manifest["height"],
+        srcset=", ".join(f"{UPLOAD_URL}{digest}-{width}.{extension} {width}w" for width in widths),
+        webp_srcset=", ".join(f"{UPLOAD_URL}{digest}-{width}.webp {width}w" for width in widths),
+    )
+
+
+def image_variants(src):
+    """Варіанти для локального зображення або None для зовнішнього URL"""
+    match = _LOCAL_NAME.match(src or "")
+    return _manifest(match.group("digest")) if match else None
+
+
+def image_url(src, width):
+    """URL найменшого варіанту не вужчого за width (для CSS-фонів)"""
+    variants = image_variants(src)
+    if variants is None:
+        return src
+    for candidate in variants.srcset.split(", "):
+        url, descriptor = candidate.rsplit(" ", 1)
+        if int(descriptor[:-1]) >= width:
+            return url
+    return variants.src
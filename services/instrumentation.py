@@ -0,0 +1,246 @@
+"""Вимірювання запитів: час, кількість і тривалість SQL-запитів, рядки.
+
+Події курсора SQLAlchemy (before/after_cursor_execute) зараховуються до
+поточного HTTP-запиту через contextvar, а хуки Flask відкривають і
+закривають вимір. Для кожного endpoint зберігається вікно останніх
+METRICS_WINDOW вимірів; запити, довші за SLOW_REQUEST_MS, пишуться в лог
+одним JSON-рядком.
+
+Рядки — це rowcount виконаних інструкцій (у SQLite лише для змін даних)
+плюс кількість об'єктів, завантажених ORM.
+"""
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from flask import request, session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from settings import Base
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", "200"))
+MAX_STATEMENT_LENGTH = 300
+
+logger = logging.getLogger("restaurant.requests")
+
+_current = ContextVar("request_metrics", default=None)
+
+
+@dataclass(slots=True)
+class RequestMetrics:
+    endpoint: str
+    method: str
+    path: str
+    started: float = field(default_factory=time.perf_counter)
+    status: int = 0
+    wall_ms: float = 0.0
+    query_count: int = 0
+    query_ms: float = 0.0
+    rows: int = 0
+    slowest_query_ms: float = 0.0
+    slowest_query: str = ""
+    streaming: bool = False
+
+    def add_query(self, statement, elapsed_ms, rowcount):
+        self.query_count += 1
+        self.query_ms += elapsed_ms
+        if rowcount > 0:
+            self.rows += rowcount
+        if elapsed_ms > self.slowest_query_ms:
+            self.slowest_query_ms = elapsed_ms
+            self.slowest_query = statement
+
+    def as_record(self):
+        return {
+            "endpoint": self.endpoint,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "wall_ms": round(self.wall_ms, 2),
+            "query_count": self.query_count,
+            "query_ms": round(self.query_ms, 2),
+            "rows": self.rows,
+            "slowest_query_ms": round(self.slowest_query_ms, 2),
+            "slowest_query": " ".join(self.slowest_query.split())[:MAX_STATEMENT_LENGTH],
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class EndpointSummary:
+    endpoint: str
+    requests: int
+    window: int
+    avg_ms: float
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+    avg_queries: float
+    avg_query_ms: float
+    avg_rows: float
+    errors: int
+
+    @property
+    def db_share(self):
+        """Частка часу запиту, витрачена в базі"""
+        return self.avg_query_ms / self.avg_ms if self.avg_ms else 0.0
+
+
+def _percentile(sorted_values, fraction):
+    index = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+class EndpointStats:
+    """Ковзне вікно вимірів одного endpoint"""
+
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+        self.requests = 0
+
+    def add(self, metrics):
+        self.requests += 1
+        self.samples.append((metrics.wall_ms, metrics.query_count, metrics.query_ms,
+                             metrics.rows, metrics.status >= 500))
+
+    def summary(self, endpoint):
+        samples = list(self.samples)
+        count = len(samples)
+        walls = sorted(sample[0] for sample in samples)
+        return EndpointSummary(
+            endpoint=endpoint,
+            requests=self.requests,
+            window=count,
+            avg_ms=sum(walls) / count,
+            p50_ms=_percentile(walls, 0.5),
+            p95_ms=_percentile(walls, 0.95),
+            max_ms=walls[-1],
+            avg_queries=sum(sample[1] for sample in samples) / count,
+            avg_query_ms=sum(sample[2] for sample in samples) / count,
+            avg_rows=sum(sample[3] for sample in samples) / count,
+            errors=sum(sample[4] for sample in samples),
+        )
+
+
+_endpoints = {}
+_endpoints_lock = threading.Lock()
+
+
+def record(metrics):
+    with _endpoints_lock:
+        stats = _endpoints.get(metrics.endpoint)
+        if stats is None:
+            stats = _endpoints[metrics.endpoint] = EndpointStats(METRICS_WINDOW)
+        stats.add(metrics)
+
+
+def endpoint_summaries():
+    """Зведення по endpoint, найдорожчі (сумарно за вікно) спочатку"""
+    with _endpoints_lock:
+        summaries = [stats.summary(endpoint) for endpoint, stats in _endpoints.items() if stats.samples]
+    return sorted(summaries, key=lambda summary: summary.avg_ms * summary.window, reverse=True)
+
+
+def reset():
+    with _endpoints_lock:
+        _endpoints.clear()
+
+
+def current_metrics():
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Час старту живе в контексті виконання одного запиту, а не в з'єднанні з
+    # пулу: запит, що впав, не лишає значення, яке зсунуло б час наступних
+    if context is not None and _current.get() is not None:
+        context.query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current.get()
+    started = getattr(context, "query_started", None)
+    if metrics is None or started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    metrics.add_query(statement, elapsed_ms, cursor.rowcount)
+
+
+def _on_load(target, context):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.rows += 1
+
+
+_listeners_installed = False
+
+
+def _install_listeners():
+    # Слухачі на класі Engine діють і для рушія, створеного пізніше
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Base, "load", _on_load, propagate=True)
+    _listeners_installed = True
+
+
+def _start_request():
+    metrics = RequestMetrics(
+        endpoint=request.endpoint or "unmatched",
+        method=request.method,
+        path=request.path,
+    )
+    request.environ["restaurant.metrics_token"] = _current.set(metrics)
+
+
+def _capture_status(response):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.status = response.status_code
+        metrics.streaming = response.mimetype == "text/event-stream"
+    return response
+
+
+def _finish_request(error=None):
+    token = request.environ.pop("restaurant.metrics_token", None)
+    metrics = _current.get()
+    if token is not None:
+        try:
+            _current.reset(token)
+        except ValueError:
+            # Teardown у іншому контексті (наприклад, відкладений контекст тестового клієнта)
+            _current.set(None)
+    if metrics is None or metrics.streaming:
+        # Тривалість потоку подій — це час підключення клієнта, а не обробки
+        return
+
+    metrics.wall_ms = (time.perf_counter() - metrics.started) * 1000
+    if error is not None or not metrics.status:
+        metrics.status = 500
+    record(metrics)
+
+    if metrics.wall_ms >= SLOW_REQUEST_MS:
+        entry = metrics.as_record()
+        entry["event"] = "slow_request"
+        entry["threshold_ms"] = SLOW_REQUEST_MS
+        entry["user_id"] = session.get("_user_id")
+        logger.warning(json.dumps(entry, ensure_ascii=False))
+
+
+def init_instrumentation(app):
+    """Підключає вимірювання до застосунку (REQUEST_METRICS=0 вимикає)"""
+    if not app.config.get("REQUEST_METRICS", True):
+        return
+    _install_listeners()
+    app.before_request(_start_request)
+    app.after_request(_capture_status)
+    app.teardown_request(_finish_request)
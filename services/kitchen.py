@@ -0,0 +1,173 @@
+"""Черга кухні: підтверджені та ті, що готуються, замовлення в пам'яті.
+
+Черга будується з бази один раз (при старті воркера або першому
+зверненні), а далі оновлюється з outbox-подій order_events: перед
+кожним читанням доїдаються лише нові події одним запитом за індексом.
+Так черга однакова в усіх воркерах без повного запиту замовлень на
+кожне оновлення екрана. Порядок — пріоритет (більший спершу), потім
+час створення; позиція в списку підтримується через bisect.
+
+Якщо потрібні події вже видалені з outbox, черга перебудовується.
+Курсор просувається до останнього застосованого id, тому черга покладається
+на те, що id подій комітяться по порядку (див. services.order_events).
+"""
+import threading
+from bisect import bisect_left, insort
+from dataclasses import dataclass, replace
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from models import Menu, Order, OrderEvent, OrderHeader, OrderStatus, User
+from settings import Session
+
+QUEUE_STATUSES = (OrderStatus.CONFIRMED, OrderStatus.PREPARING)
+# Дозволені масові переходи: цільовий статус -> з яких статусів
+TRANSITIONS = {
+    OrderStatus.PREPARING: (OrderStatus.CONFIRMED,),
+    OrderStatus.READY: (OrderStatus.PREPARING,),
+    OrderStatus.CANCELLED: QUEUE_STATUSES,
+}
+CATCH_UP_LIMIT = 1000
+
+
+@dataclass(frozen=True, slots=True)
+class KitchenTicket:
+    id: int
+    status: OrderStatus
+    priority: int
+    created_at: datetime
+    user: str | None
+    lines: tuple
+    items_count: int
+
+    @property
+    def sort_key(self):
+        return -self.priority, self.created_at, self.id
+
+
+class KitchenQueue:
+    """Впорядкована черга кухні, синхронізована через order_events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tickets = {}
+        self._order = []
+        self._cursor = None
+
+    @property
+    def cursor(self):
+        """Id останньої застосованої події"""
+        return self._cursor
+
+    def _insert(self, ticket):
+        self._remove(ticket.id)
+        self._tickets[ticket.id] = ticket
+        insort(self._order, (ticket.sort_key, ticket.id))
+
+    def _remove(self, header_id):
+        ticket = self._tickets.pop(header_id, None)
+        if ticket is not None:
+            entry = (ticket.sort_key, ticket.id)
+            del self._order[bisect_left(self._order, entry)]
+
+    def _load_tickets(self, db_session, header_ids=None):
+        query = (
+            select(OrderHeader.id, OrderHeader.status, OrderHeader.priority, OrderHeader.created_at,
+                   OrderHeader.items_count, User.username)
+            .join(User, User.id == OrderHeader.user_id)
+            .where(OrderHeader.status.in_(QUEUE_STATUSES))
+        )
+        if header_ids is not None:
+            query = query.where(OrderHeader.id.in_(list(header_ids)))
+        headers = db_session.execute(query).all()
+        lines = {}
+        if headers:
+            for header_id, name, quantity in db_session.execute(
+                select(Order.header_id, Menu.name, Order.quantity)
+                .join(Menu, Menu.id == Order.menu_id)
+                .where(Order.header_id.in_([header.id for header in headers]))
+                .order_by(Order.id)
+            ):
+                lines.setdefault(header_id, []).append((name, quantity))
+        return [
+            KitchenTicket(id=header.id, status=header.status, priority=header.priority or 0,
+                          created_at=header.created_at, user=header.username,
+                          lines=tuple(lines.get(header.id, ())), items_count=header.items_count)
+            for header in headers
+        ]
+
+    def rebuild(self):
+        with self._lock, Session() as db_session:
+            # Курсор читається до замовлень: подія між запитами застосується
+            # повторно, а це безпечно
+            cursor = db_session.execute(select(func.max(OrderEvent.id))).scalar() or 0
+            tickets = self._load_tickets(db_session)
+            self._tickets, self._order = {}, []
+            for ticket in tickets:
+                self._insert(ticket)
+            self._cursor = cursor
+
+    def _catch_up(self):
+        with Session() as db_session:
+            rows = db_session.execute(
+                select(OrderEvent.id, OrderEvent.kind, OrderEvent.header_id, OrderEvent.payload)
+                .where(OrderEvent.id > self._cursor)
+                .order_by(OrderEvent.id)
+                .limit(CATCH_UP_LIMIT + 1)
+            ).all()
+            oldest = db_session.execute(select(func.min(OrderEvent.id))).scalar() if rows else None
+            if len(rows) > CATCH_UP_LIMIT or (oldest is not None and oldest > self._cursor + 1):
+                return False
+            missing = set()
+            for event_id, kind, header_id, payload in rows:
+                self._apply(kind, header_id, payload, missing)
+                self._cursor = event_id
+            if missing:
+                for ticket in self._load_tickets(db_session, missing):
+                    self._insert(ticket)
+        return True
+
+    def _apply(self, kind, header_id, payload, missing):
+        ticket = self._tickets.get(header_id)
+        if kind == "order_created":
+            status = OrderStatus[payload["status"]]
+            if status in QUEUE_STATUSES and "created_iso" not in payload:
+                # Подія старого формату — дані беремо з бази
+                missing.add(header_id)
+            elif status in QUEUE_STATUSES:
+                self._insert(KitchenTicket(
+                    id=header_id, status=status, priority=payload.get("priority", 0),
+                    created_at=datetime.fromisoformat(payload["created_iso"]), user=payload["user"],
+                    lines=tuple(tuple(line) for line in payload["lines"]),
+                    items_count=payload["items_count"],
+                ))
+        elif kind == "order_status":
+            status = OrderStatus[payload["status"]]
+            if status not in QUEUE_STATUSES:
+                self._remove(header_id)
+                missing.discard(header_id)
+            elif ticket is not None:
+                self._tickets[header_id] = replace(ticket, status=status)
+            else:
+                # Повернення в чергу (наприклад, READY -> PREPARING): дані з бази
+                missing.add(header_id)
+        elif kind == "order_deleted":
+            self._remove(header_id)
+            missing.discard(header_id)
+        elif kind == "order_priority" and ticket is not None:
+            self._insert(replace(ticket, priority=payload["priority"]))
+
+    def tickets(self):
+        """Актуальна черга: список KitchenTicket у порядку приготування"""
+        if self._cursor is None:
+            self.rebuild()
+        with self._lock:
+            up_to_date = self._catch_up()
+        if not up_to_date:
+            self.rebuild()
+        with self._lock:
+            return [self._tickets[header_id] for _, header_id in self._order]
+
+
+kitchen_queue = KitchenQueue()
@@ -0,0 +1,209 @@
+"""Серверний пошук, фільтр за категорією та пагінація меню.
+
+На SQLite пошук іде через повнотекстовий індекс FTS5 (menu_fts) з
+ранжуванням bm25. Індекс містить лише активні страви, rowid = menu.id,
+і оновлюється адмінкою в тій самій транзакції, що й зміна страви.
+На інших СУБД (або без FTS5) шукаємо підрядком по знімку каталогу.
+"""
+import functools
+import math
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+
+from sqlalchemy import text
+
+from models import Menu
+from services.catalog import get_catalog
+from settings import Session
+
+FTS_TABLE = "menu_fts"
+DEFAULT_PER_PAGE = 24
+MAX_PER_PAGE = 96
+MAX_TERMS = 8
+
+# Вага колонок для bm25: назва важливіша за категорію, категорія за опис
+_RANK = f"bm25({FTS_TABLE}, 10.0, 2.0, 5.0)"
+
+_ready = False
+_ready_lock = threading.Lock()
+
+
+@dataclass(frozen=True, slots=True)
+class MenuPage:
+    items: tuple
+    total: int
+    page: int
+    per_page: int
+    query: str
+    category: str | None
+
+    @property
+    def pages(self):
+        return max(1, math.ceil(self.total / self.per_page))
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+    @property
+    def has_next(self):
+        return self.page < self.pages
+
+
+@functools.cache
+def _fts5_compiled():
+    """Чи зібрано бібліотеку SQLite з підтримкою FTS5"""
+    try:
+        sqlite3.connect(":memory:").execute("CREATE VIRTUAL TABLE probe USING fts5(x)")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def _fts_available(db_session):
+    return db_session.get_bind().dialect.name == "sqlite" and _fts5_compiled()
+
+
+def rebuild_index(db_session):
+    """Створює (за потреби) та повністю перебудовує індекс з таблиці menu.
+
+    Працює в транзакції викликача, коміт робить викликач.
+    """
+    db_session.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+        f"USING fts5(name, description, category, tokenize='unicode61 remove_diacritics 2')"
+    ))
+    db_session.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    db_session.execute(text(
+        f"INSERT INTO {FTS_TABLE}(rowid, name, description, category) "
+        f"SELECT id, name, coalesce(description, ''), coalesce(category, '') FROM menu WHERE active = 1"
+    ))
+
+
+def ensure_index():
+    """Один раз на процес перевіряє, що індекс існує і збігається з меню"""
+    global _ready
+    if _ready:
+        return True
+    with _ready_lock, Session() as db_session:
+        if _ready:
+            return True
+        if not _fts_available(db_session):
+            return False
+        exists = db_session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE}
+        ).first()
+        indexed = db_session.execute(text(f"SELECT count(*) FROM {FTS_TABLE}")).scalar() if exists else -1
+        active = db_session.query(Menu).filter(Menu.active == True).count()
+        if indexed != active:
+            rebuild_index(db_session)
+            db_session.commit()
+        _ready = True
+    return True
+
+
+def index_item(db_session, item):
+    """Оновлює запис страви в індексі в транзакції адмінки.
+
+    Неактивні страви з індексу прибираються. Якщо процес ще не
+    перевіряв індекс, просто перебудовуємо його цілком — це дешево
+    і не потребує окремого з'єднання, яке б чекало на блокування.
+    """
+    if not _fts_available(db_session):
+        return
+    if not _ready:
+        rebuild_index(db_session)
+        return
+    db_session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": item.id})
+    if item.active:
+        db_session.execute(
+            text(f"INSERT INTO {FTS_TABLE}(rowid, name, description, category) "
+                 f"VALUES (:id, :name, :description, :category)"),
+            {"id": item.id, "name": item.name,
+             "description": item.description or "", "category": item.category or ""}
+        )
+
+
+def remove_item(db_session, item_id):
+    if not _fts_available(db_session):
+        return
+    if not _ready:
+        rebuild_index(db_session)
+        return
+    db_session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": item_id})
+
+
+def _match_expression(query):
+    """Перетворює введений текст у безпечний запит FTS5 з пошуком за префіксом"""
+    terms = re.findall(r"\w+", query)[:MAX_TERMS]
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _ranked_ids(expression):
+    if not ensure_index():
+        return None
+    with Session() as db_session:
+        rows = db_session.execute(
+            text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :q ORDER BY {_RANK}"),
+            {"q": expression}
+        )
+        return [row[0] for row in rows]
+
+
+def _fallback_search(items, query):
+    terms = [term.casefold() for term in re.findall(r"\w+", query)[:MAX_TERMS]]
+    scored = []
+    for item in items:
+        name = item.name.casefold()
+        category = (item.category or "").casefold()
+        description = (item.description or "").casefold()
+        score = 0
+        for term in terms:
+            if term in name:
+                score += 10
+            elif term in category:
+                score += 5
+            elif term in description:
+                score += 2
+            else:
+                break
+        else:
+            scored.append((-score, item.id, item))
+    return [item for _, _, item in sorted(scored)]
+
+
+def search_menu(query="", category=None, page=1, per_page=DEFAULT_PER_PAGE) -> MenuPage:
+    catalog = get_catalog()
+    query = (query or "").strip()
+    category = category if category in catalog.by_category else None
+    per_page = min(max(per_page or DEFAULT_PER_PAGE, 1), MAX_PER_PAGE)
+
+    if query and _match_expression(query):
+        ids = _ranked_ids(_match_expression(query))
+        if ids is None:
+            items = _fallback_search(catalog.items, query)
+        else:
+            # Знімок каталогу може бути трохи застарілим відносно індексу
+            items = [catalog.by_id[item_id] for item_id in ids if item_id in catalog.by_id]
+        if category:
+            items = [item for item in items if item.category == category]
+    elif category:
+        items = catalog.by_category[category]
+    else:
+        items = catalog.items
+
+    total = len(items)
+    pages = max(1, math.ceil(total / per_page))
+    page = min(max(page or 1, 1), pages)
+    start = (page - 1) * per_page
+    return MenuPage(
+        items=tuple(items[start:start + per_page]),
+        total=total,
+        page=page,
+        per_page=per_page,
+        query=query,
+        category=category,
+    )
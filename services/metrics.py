@@ -0,0 +1,272 @@
+"""Метрики у текстовому форматі Prometheus, спільні для всіх воркерів.
+
+Кожен процес накопичує прирости лічильників і гістограм у пам'яті та
+раз на METRICS_FLUSH_SECONDS дописує їх у локальний файл SQLite
+(METRICS_DB). Gauge-значення (запити в обробці, пул з'єднань) кожен
+процес записує під своїм pid; при зборі вони сумуються по процесах,
+що оновлювались не пізніше METRICS_STALE_SECONDS тому. /metrics спершу
+скидає прирости свого процесу, тож значення інших воркерів можуть
+відставати не більше ніж на інтервал скидання.
+
+Бізнес-лічильники (кошик, оформлення, зміни статусів) реєструються в
+сесії SQLAlchemy через count_on_commit() і зараховуються лише після
+успішного коміту.
+"""
+import atexit
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+
+from settings import current_engine
+
+METRICS_DB = os.getenv("METRICS_DB", os.path.join(tempfile.gettempdir(), "restaurant_metrics.db"))
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+METRICS_STALE_SECONDS = float(os.getenv("METRICS_STALE_SECONDS", "60"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (тип, опис)
+FAMILIES = {
+    "restaurant_http_request_duration_seconds": ("histogram", "Час обробки HTTP-запиту"),
+    "restaurant_http_requests_total": ("counter", "HTTP-запити за маршрутом і статусом"),
+    "restaurant_http_requests_in_flight": ("gauge", "Запити в обробці"),
+    "restaurant_db_pool_size": ("gauge", "Розмір пулу з'єднань"),
+    "restaurant_db_pool_checked_out": ("gauge", "З'єднання, видані з пулу"),
+    "restaurant_db_pool_overflow": ("gauge", "З'єднання понад розмір пулу"),
+    "restaurant_worker_processes": ("gauge", "Живі процеси, що звітують метрики"),
+    "restaurant_cart_additions_total": ("counter", "Додавання страв до кошика"),
+    "restaurant_checkouts_total": ("counter", "Оформлені замовлення"),
+    "restaurant_order_status_transitions_total": ("counter", "Зміни статусу замовлень"),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (name, labels)
+);
+CREATE TABLE IF NOT EXISTS gauges (
+    pid INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    value REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (pid, name, labels)
+);
+"""
+
+_lock = threading.Lock()
+_counters = {}
+_in_flight = 0
+_last_flush = 0.0
+_schema_ready = False
+
+
+def _key(name, labels):
+    return name, json.dumps(sorted(labels.items()), ensure_ascii=False)
+
+
+def inc(name, amount=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def observe_request(endpoint, method, status, seconds):
+    base = {"endpoint": endpoint, "method": method}
+    first_bucket = bisect_left(LATENCY_BUCKETS, seconds)
+    name = "restaurant_http_request_duration_seconds"
+    with _lock:
+        # Гістограма зберігається кумулятивно, як її віддає Prometheus
+        for bound in LATENCY_BUCKETS[first_bucket:] + (float("inf"),):
+            key = _key(name + "_bucket", {**base, "le": _format_value(bound)})
+            _counters[key] = _counters.get(key, 0) + 1
+        for suffix, amount in (("_sum", seconds), ("_count", 1)):
+            key = _key(name + suffix, base)
+            _counters[key] = _counters.get(key, 0) + amount
+        key = _key("restaurant_http_requests_total", {**base, "status": str(status)})
+        _counters[key] = _counters.get(key, 0) + 1
+
+
+def count_on_commit(db_session, name, amount=1, **labels):
+    """Відкладений inc(): спрацює після коміту сесії, при відкаті відкидається"""
+    db_session.info.setdefault("metrics", []).append((name, amount, labels))
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _apply_on_commit(db_session):
+    for name, amount, labels in db_session.info.pop("metrics", ()):
+        inc(name, amount, **labels)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_on_rollback(db_session):
+    db_session.info.pop("metrics", None)
+
+
+def _connect():
+    global _schema_ready
+    connection = sqlite3.connect(METRICS_DB, timeout=5)
+    if not _schema_ready:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+        _schema_ready = True
+    return connection
+
+
+def _gauges():
+    values = {_key("restaurant_http_requests_in_flight", {}): _in_flight,
+              _key("restaurant_worker_processes", {}): 1}
+    engine = current_engine()
+    if engine is not None:
+        pool = engine.pool
+        for name, getter in (("size", "size"), ("checked_out", "checkedout"), ("overflow", "overflow")):
+            if hasattr(pool, getter):
+                # QueuePool.overflow() від'ємний, поки пул не заповнений
+                values[_key(f"restaurant_db_pool_{name}", {})] = max(getattr(pool, getter)(), 0)
+    return values
+
+
+def flush():
+    """Записує прирости цього процесу та його gauge-значення у спільне сховище"""
+    global _counters, _last_flush
+    with _lock:
+        deltas, _counters = _counters, {}
+        _last_flush = time.monotonic()
+    gauges = _gauges()
+    now = time.time()
+    try:
+        with _connect() as connection:
+            connection.executemany(
+                "INSERT INTO counters (name, labels, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value",
+                [(name, labels, value) for (name, labels), value in deltas.items()],
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO gauges (pid, name, labels, value, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(os.getpid(), name, labels, value, now) for (name, labels), value in gauges.items()],
+            )
+    except sqlite3.Error:
+        # Сховище недоступне: повертаємо прирости, щоб не втратити їх
+        with _lock:
+            for key, value in deltas.items():
+                _counters[key] = _counters.get(key, 0) + value
+        raise
+
+
+def maybe_flush():
+    if time.monotonic() - _last_flush >= METRICS_FLUSH_SECONDS:
+        try:
+            flush()
+        except sqlite3.Error:
+            pass
+
+
+def _forget_process():
+    try:
+        flush()
+        with _connect() as connection:
+            connection.execute("DELETE FROM gauges WHERE pid = ?", (os.getpid(),))
+    except Exception:
+        pass
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels_json):
+    labels = json.loads(labels_json)
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _family(name):
+    for suffix in ("_bucket", "_sum", "_count"):
+        if name.endswith(suffix) and name[:-len(suffix)] in FAMILIES:
+            return name[:-len(suffix)]
+    return name
+
+
+def _bucket_order(sample):
+    name, labels_json, _ = sample
+    labels = dict(json.loads(labels_json))
+    le = labels.pop("le", None)
+    bound = float("inf") if le == "+Inf" else float(le) if le is not None else 0.0
+    return json.dumps(sorted(labels.items())), name, bound
+
+
+def render():
+    """Повертає метрики всіх воркерів у форматі Prometheus text 0.0.4"""
+    flush()
+    with _connect() as connection:
+        samples = connection.execute("SELECT name, labels, value FROM counters").fetchall()
+        samples += connection.execute(
+            "SELECT name, labels, SUM(value) FROM gauges WHERE updated_at >= ? GROUP BY name, labels",
+            (time.time() - METRICS_STALE_SECONDS,),
+        ).fetchall()
+
+    by_family = {}
+    for sample in samples:
+        by_family.setdefault(_family(sample[0]), []).append(sample)
+
+    lines = []
+    for family, (kind, description) in FAMILIES.items():
+        lines.append(f"# HELP {family} {description}")
+        lines.append(f"# TYPE {family} {kind}")
+        for name, labels_json, value in sorted(by_family.get(family, ()), key=_bucket_order):
+            lines.append(f"{name}{_format_labels(labels_json)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _start_request():
+    global _in_flight
+    with _lock:
+        _in_flight += 1
+    request.environ["restaurant.metrics_started"] = time.perf_counter()
+
+
+def _finish_request(error=None):
+    global _in_flight
+    started = request.environ.pop("restaurant.metrics_started", None)
+    if started is None:
+        return
+    with _lock:
+        _in_flight -= 1
+    status = request.environ.get("restaurant.response_status", 500 if error else 200)
+    observe_request(request.endpoint or "unmatched", request.method, status,
+                    time.perf_counter() - started)
+    maybe_flush()
+
+
+def _capture_status(response):
+    request.environ["restaurant.response_status"] = response.status_code
+    return response
+
+
+def init_metrics(app):
+    """Підключає збір метрик до застосунку (METRICS_ENABLED=0 вимикає)"""
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+    app.before_request(_start_request)
+    app.after_request(_capture_status)
+    app.teardown_request(_finish_request)
+    atexit.register(_forget_process)
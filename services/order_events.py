@@ -0,0 +1,253 @@
+"""Події замовлень для живої дошки (Server-Sent Events).
+
+publish() додає подію в таблицю order_events у транзакції викликача,
+тож подія існує лише для закоміченої зміни і бачить її кожен воркер.
+У кожному процесі один фоновий потік раз на ORDER_EVENTS_POLL_SECONDS
+читає нові події одним запитом за індексом і роздає їх підписникам —
+скільки б екранів не було відкрито, база бачить один запит на воркер.
+
+Буфер підписника обмежений (ORDER_EVENTS_BUFFER): повільний клієнт не
+накопичує пам'ять, а отримує подію reset і перезавантажує сторінку.
+Те саме відбувається, якщо Last-Event-ID старший за збережені події
+(ORDER_EVENTS_RETENTION_SECONDS).
+
+Читачі (дошка і services.kitchen) просувають курсор до найбільшого
+побаченого id, тож id мають комітитись по порядку. У SQLite записи і так
+послідовні, а в Postgres вставка бере транзакційний advisory-lock до
+коміту: інакше пізніший id міг би закомітитись раніше, і курсор
+перестрибнув би подію, яку ще не видно.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, text
+
+from models import Menu, Order, OrderEvent, User
+from settings import Session
+
+ORDER_EVENTS_POLL_SECONDS = float(os.getenv("ORDER_EVENTS_POLL_SECONDS", "1"))
+ORDER_EVENTS_BUFFER = int(os.getenv("ORDER_EVENTS_BUFFER", "100"))
+ORDER_EVENTS_RETENTION_SECONDS = int(os.getenv("ORDER_EVENTS_RETENTION_SECONDS", "3600"))
+HEARTBEAT_SECONDS = 15
+# Після цього з'єднання закривається, а EventSource перепідключається з Last-Event-ID
+STREAM_SECONDS = int(os.getenv("ORDER_EVENTS_STREAM_SECONDS", "300"))
+RECONNECT_MS = 3000
+PRUNE_EVERY_SECONDS = 60
+BACKLOG_LIMIT = 500
+
+RESET = object()
+# Ключ advisory-lock для впорядкування вставок в outbox (Postgres)
+OUTBOX_LOCK_KEY = 0x6F726476
+
+
+def publish(db_session, kind, header_id, **payload):
+    """Додає подію в поточну транзакцію (без коміту)"""
+    publish_many(db_session, kind, [(header_id, payload)])
+
+
+def publish_many(db_session, kind, events):
+    """Одним INSERT додає події [(header_id, payload), ...]"""
+    rows = [{"header_id": header_id, "kind": kind, "payload": {"id": header_id, **payload},
+             "created_at": datetime.now()} for header_id, payload in events]
+    if rows:
+        if db_session.get_bind().dialect.name == "postgresql":
+            # Тримається до коміту: наступна транзакція отримає більший id лише після нашого коміту
+            db_session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": OUTBOX_LOCK_KEY})
+        db_session.execute(insert(OrderEvent), rows)
+
+
+def order_created_payload(db_session, header):
+    """Дані нового замовлення, достатні, щоб дошка додала рядок без запиту"""
+    rows = db_session.execute(
+        select(User.username, Menu.name, Order.quantity)
+        .join(Menu, Menu.id == Order.menu_id)
+        .join(User, User.id == Order.user_id)
+        .where(Order.header_id == header.id)
+        .order_by(Order.id)
+    ).all()
+    return {
+        "user": rows[0].username if rows else None,
+        "lines": [[row.name, row.quantity] for row in rows],
+        "items_count": header.items_count,
+        "total_price": header.total_price,
+        "status": header.status.name,
+        "created_at": header.created_at.strftime("%d.%m.%Y %H:%M"),
+        "created_iso": header.created_at.isoformat(),
+        "priority": header.priority or 0,
+    }
+
+
+def latest_event_id(db_session):
+    """Id останньої події: сторінка передає його потоку як точку відліку"""
+    return db_session.execute(select(func.max(OrderEvent.id))).scalar() or 0
+
+
+def format_event(event_id, kind, payload):
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+class Subscription:
+    """Обмежена черга подій одного клієнта"""
+
+    def __init__(self, buffer_size):
+        self.queue = queue.Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+    def put(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # Клієнт не встигає: решту подій відкидаємо, він отримає reset
+            self.overflowed = True
+
+    def get(self, timeout):
+        if self.overflowed:
+            return RESET
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class OrderEventBroker:
+    """Роздає події з order_events підписникам цього процесу"""
+
+    def __init__(self, poll_seconds=ORDER_EVENTS_POLL_SECONDS, buffer_size=ORDER_EVENTS_BUFFER):
+        self.poll_seconds = poll_seconds
+        self.buffer_size = buffer_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._cursor = None
+        self._thread = None
+        self._last_prune = 0.0
+
+    def subscribe(self, last_event_id=None):
+        """Реєструє підписника.
+
+        Повертає (підписка, пропущені події або RESET, id останньої події).
+        """
+        subscription = Subscription(self.buffer_size)
+        # Спершу реєстрація, потім читання пропущеного: подія між ними
+        # прийде двічі (клієнт відкине дубль), але не загубиться
+        with self._lock:
+            self._subscribers.add(subscription)
+        backlog, latest = self._backlog(last_event_id)
+        with self._lock:
+            # Курсор лише зменшується: поки опитування не йшло, інший
+            # підписник міг задати курсор новіший за наш знімок
+            if self._cursor is None or latest < self._cursor:
+                self._cursor = latest
+            self._ensure_thread()
+        return subscription, backlog, latest
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _backlog(self, last_event_id):
+        with Session() as db_session:
+            oldest, latest = db_session.execute(
+                select(func.min(OrderEvent.id), func.max(OrderEvent.id))
+            ).one()
+            latest = latest or 0
+            if last_event_id is None or last_event_id == latest:
+                return [], latest
+            if last_event_id > latest or (oldest is not None and last_event_id < oldest - 1):
+                # Події вже видалені або база інша — частковим оновленням не обійтись
+                return RESET, latest
+            rows = db_session.execute(
+                select(OrderEvent.id, OrderEvent.kind, OrderEvent.payload)
+                .where(OrderEvent.id > last_event_id)
+                .order_by(OrderEvent.id)
+                .limit(BACKLOG_LIMIT + 1)
+            ).all()
+        if len(rows) > BACKLOG_LIMIT:
+            return RESET, latest
+        return [tuple(row) for row in rows], latest
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="order-events", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            with self._lock:
+                if not self._subscribers:
+                    # Без підписників не опитуємо; новий підписник задасть курсор
+                    self._cursor = None
+                cursor = self._cursor
+            if cursor is None:
+                continue
+            try:
+                self.poll_once(cursor)
+            except Exception:
+                # База тимчасово недоступна: спробуємо на наступному кроці
+                continue
+
+    def poll_once(self, cursor):
+        with Session() as db_session:
+            rows = db_session.execute(
+                select(OrderEvent.id, OrderEvent.kind, OrderEvent.payload)
+                .where(OrderEvent.id > cursor)
+                .order_by(OrderEvent.id)
+            ).all()
+            if time.monotonic() - self._last_prune >= PRUNE_EVERY_SECONDS:
+                self._last_prune = time.monotonic()
+                # Останню подію лишаємо завжди: її id не дає номерам почати з початку
+                db_session.execute(delete(OrderEvent).where(
+                    OrderEvent.created_at < datetime.now() - timedelta(seconds=ORDER_EVENTS_RETENTION_SECONDS),
+                    OrderEvent.id < select(func.max(OrderEvent.id)).scalar_subquery(),
+                ))
+                db_session.commit()
+        if not rows:
+            return
+        # Роздача і зсув курсора під одним замком: хто підписався пізніше,
+        # прочитав ці події сам у subscribe()
+        with self._lock:
+            if self._cursor is not None:
+                self._cursor = max(self._cursor, rows[-1][0])
+            for row in rows:
+                for subscription in self._subscribers:
+                    subscription.put(tuple(row))
+
+
+broker = OrderEventBroker()
+
+
+def stream(last_event_id=None, stream_seconds=STREAM_SECONDS):
+    """Генератор тексту text/event-stream для одного клієнта"""
+    subscription, backlog, latest = broker.subscribe(last_event_id)
+    try:
+        yield f"retry: {RECONNECT_MS}\n\n"
+        if backlog is RESET:
+            yield "event: reset\ndata: {}\n\n"
+            return
+        sent = latest if last_event_id is None else last_event_id
+        for event_id, kind, payload in backlog:
+            sent = event_id
+            yield format_event(event_id, kind, payload)
+
+        deadline = time.monotonic() + stream_seconds
+        while time.monotonic() < deadline:
+            event = subscription.get(timeout=min(HEARTBEAT_SECONDS, max(deadline - time.monotonic(), 0)))
+            if event is RESET:
+                yield "event: reset\ndata: {}\n\n"
+                return
+            if event is None:
+                yield ": ping\n\n"
+                continue
+            event_id, kind, payload = event
+            if event_id <= sent:
+                continue
+            sent = event_id
+            yield format_event(event_id, kind, payload)
+    finally:
+        broker.unsubscribe(subscription)
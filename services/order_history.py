@@ -0,0 +1,77 @@
+"""Історія замовлень користувача з keyset-пагінацією по живих і архівних таблицях.
+
+Сторінка читається двома запитами за індексами (user_id, created_at, id)
+— з order_headers і з order_headers_archive, — які зливаються в один
+спадний порядок; рядки страв підвантажуються лише для замовлень сторінки.
+Курсор той самий, що й в адмінці (services.pagination).
+"""
+import heapq
+import os
+from dataclasses import dataclass, replace
+from datetime import datetime
+
+from sqlalchemy import select
+
+from models import ArchivedOrder, ArchivedOrderHeader, Menu, Order, OrderHeader, OrderStatus
+from services.pagination import encode_cursor, keyset_before
+
+HISTORY_PER_PAGE = int(os.getenv("ORDER_HISTORY_PER_PAGE", "20"))
+
+
+@dataclass(frozen=True, slots=True)
+class HistoryOrder:
+    id: int
+    status: OrderStatus
+    total_price: float
+    items_count: int
+    created_at: datetime
+    archived: bool
+    lines: tuple = ()
+
+
+def _headers(db_session, model, user_id, cursor, limit):
+    query = (
+        select(model.id, model.status, model.total_price, model.items_count, model.created_at)
+        .where(model.user_id == user_id)
+    )
+    if cursor:
+        query = query.where(keyset_before(model.created_at, model.id, cursor))
+    rows = db_session.execute(query.order_by(model.created_at.desc(), model.id.desc()).limit(limit))
+    return [HistoryOrder(id=row.id, status=row.status, total_price=row.total_price, items_count=row.items_count,
+                         created_at=row.created_at, archived=model is ArchivedOrderHeader)
+            for row in rows]
+
+
+def _lines(db_session, query):
+    lines = {}
+    for header_id, name, quantity in db_session.execute(query):
+        lines.setdefault(header_id, []).append((name, quantity))
+    return lines
+
+
+def history_page(db_session, user_id, cursor=None, per_page=HISTORY_PER_PAGE):
+    """Повертає (список HistoryOrder, курсор наступної сторінки або None)"""
+    merged = heapq.merge(
+        _headers(db_session, OrderHeader, user_id, cursor, per_page + 1),
+        _headers(db_session, ArchivedOrderHeader, user_id, cursor, per_page + 1),
+        key=lambda order: (order.created_at, order.id), reverse=True,
+    )
+    orders = [order for _, order in zip(range(per_page + 1), merged)]
+    next_cursor = None
+    if len(orders) > per_page:
+        orders = orders[:per_page]
+        next_cursor = encode_cursor(orders[-1].created_at, orders[-1].id)
+
+    live_ids = [order.id for order in orders if not order.archived]
+    archived_ids = [order.id for order in orders if order.archived]
+    lines = {}
+    if live_ids:
+        lines.update(_lines(db_session, select(Order.header_id, Menu.name, Order.quantity)
+                            .join(Menu, Menu.id == Order.menu_id)
+                            .where(Order.header_id.in_(live_ids))
+                            .order_by(Order.id)))
+    if archived_ids:
+        lines.update(_lines(db_session, select(ArchivedOrder.header_id, ArchivedOrder.menu_name, ArchivedOrder.quantity)
+                            .where(ArchivedOrder.header_id.in_(archived_ids))
+                            .order_by(ArchivedOrder.id)))
+    return [replace(order, lines=tuple(lines.get(order.id, ()))) for order in orders], next_cursor
@@ -0,0 +1,208 @@
+"""Життєвий цикл замовлень: оформлення кошика, зміна статусів і масові операції.
+
+Усі функції працюють у транзакції викликача і не комітять сесію;
+події для живої дошки (services.order_events) пишуться в ту саму транзакцію.
+"""
+from datetime import datetime
+
+from sqlalchemy import case, delete, func, literal, select, update
+
+from models import Menu, Order, OrderHeader, OrderStatus
+from services import order_events
+from services.metrics import count_on_commit
+
+
+def checkout(db_session, user_id):
+    """Перетворює кошик користувача на одне замовлення.
+
+    Рядки кошика прив'язуються до нового заголовка одним UPDATE, а
+    підсумки рахуються в базі з уже прив'язаних рядків, тож страва,
+    додана паралельно, не потрапить у суму без потрапляння в замовлення.
+    Рядки видалених страв кошик не показує, тож вони прибираються, а не
+    оформлюються. Повертає OrderHeader або None, якщо кошик порожній.
+    """
+    cart = (Order.user_id == user_id, Order.status == OrderStatus.PENDING, Order.header_id.is_(None))
+    db_session.execute(
+        delete(Order)
+        .where(*cart, ~select(Menu.id).where(Menu.id == Order.menu_id).exists())
+        .execution_options(synchronize_session=False)
+    )
+    header = OrderHeader(user_id=user_id, status=OrderStatus.CONFIRMED)
+    db_session.add(header)
+    db_session.flush()
+
+    moved = db_session.execute(
+        update(Order)
+        .where(*cart)
+        .values(header_id=header.id, status=OrderStatus.CONFIRMED)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not moved:
+        db_session.delete(header)
+        db_session.flush()
+        return None
+
+    line_totals = select(Order).where(Order.header_id == header.id)
+    db_session.execute(
+        update(OrderHeader)
+        .where(OrderHeader.id == header.id)
+        .values(
+            total_price=line_totals.with_only_columns(func.coalesce(func.sum(Order.total_price), 0)).scalar_subquery(),
+            items_count=line_totals.with_only_columns(func.coalesce(func.sum(Order.quantity), 0)).scalar_subquery(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db_session.refresh(header)
+    order_events.publish(db_session, "order_created", header.id,
+                         **order_events.order_created_payload(db_session, header))
+    count_on_commit(db_session, "restaurant_checkouts_total")
+    # Кошик (PENDING) став замовленням (CONFIRMED) — один перехід на замовлення
+    count_on_commit(db_session, "restaurant_order_status_transitions_total",
+                    **{"from": OrderStatus.PENDING.name, "to": OrderStatus.CONFIRMED.name})
+    return header
+
+
+# Статуси, які ще можна скасувати або просунути далі
+ACTIVE_STATUSES = (OrderStatus.CONFIRMED, OrderStatus.PREPARING, OrderStatus.READY, OrderStatus.DELIVERING)
+# Завершені замовлення — лише їх дозволено видаляти
+FINAL_STATUSES = (OrderStatus.COMPLETED, OrderStatus.CANCELLED)
+NEXT_STATUS = {
+    OrderStatus.CONFIRMED: OrderStatus.PREPARING,
+    OrderStatus.PREPARING: OrderStatus.READY,
+    OrderStatus.READY: OrderStatus.DELIVERING,
+    OrderStatus.DELIVERING: OrderStatus.COMPLETED,
+}
+
+# Результат масової операції для кожного id
+CHANGED = "changed"
+NOT_ALLOWED = "not_allowed"
+NOT_FOUND = "not_found"
+
+
+def _locked_statuses(db_session, header_ids):
+    """Поточні статуси замовлень, заблокованих до кінця транзакції.
+
+    Без блокування кухня чи інший адміністратор могли б змінити статус
+    між читанням і UPDATE, і подія та метрика пішли б із хибним
+    попереднім статусом. Postgres блокує рядки через FOR UPDATE; SQLite
+    його ігнорує, тож спершу бере блокування запису UPDATE без зміни
+    значень (updated_at теж не чіпаємо).
+    """
+    if db_session.get_bind().dialect.name == "sqlite":
+        db_session.execute(
+            update(OrderHeader)
+            .where(OrderHeader.id.in_(header_ids))
+            .values(status=OrderHeader.status, updated_at=OrderHeader.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+    return dict(db_session.execute(
+        select(OrderHeader.id, OrderHeader.status).where(OrderHeader.id.in_(header_ids)).with_for_update()
+    ).all())
+
+
+def _transition(db_session, header_ids, targets):
+    """Одним UPDATE переводить замовлення за таблицею {поточний статус: новий}.
+
+    Повертає (поточні статуси знайдених замовлень, {id: попередній статус}
+    для змінених).
+    """
+    current = _locked_statuses(db_session, header_ids)
+    candidates = [header_id for header_id, status in current.items() if status in targets]
+    if not candidates:
+        return current, {}
+
+    new_statuses = set(targets.values())
+    if len(new_statuses) == 1:
+        new_value = next(iter(new_statuses))
+    else:
+        status_type = OrderHeader.__table__.c.status.type
+        new_value = case(*[(OrderHeader.status == old, literal(new, status_type)) for old, new in targets.items()])
+    updated = db_session.scalars(
+        update(OrderHeader)
+        .where(OrderHeader.id.in_(candidates), OrderHeader.status.in_(list(targets)))
+        .values(status=new_value, updated_at=datetime.now())
+        .returning(OrderHeader.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    # Події й метрики — лише для рядків, які UPDATE справді змінив
+    previous = {header_id: current[header_id] for header_id in sorted(updated)}
+    for status in previous.values():
+        count_on_commit(db_session, "restaurant_order_status_transitions_total",
+                        **{"from": status.name, "to": targets[status].name})
+    order_events.publish_many(db_session, "order_status", [
+        (header_id, {"status": targets[status].name, "previous": status.name})
+        for header_id, status in previous.items()
+    ])
+    return current, previous
+
+
+def change_status(db_session, header_ids, new_status, allowed_from=None):
+    """Set-based зміна статусу замовлень.
+
+    allowed_from обмежує, з яких статусів дозволено перехід.
+    Повертає {id: попередній статус} лише для фактично змінених замовлень.
+    """
+    header_ids = list(header_ids)
+    if not header_ids:
+        return {}
+    sources = OrderStatus if allowed_from is None else allowed_from
+    targets = {status: new_status for status in sources if status != new_status}
+    return _transition(db_session, header_ids, targets)[1]
+
+
+def _report(header_ids, current, changed):
+    return {
+        header_id: CHANGED if header_id in changed else NOT_ALLOWED if header_id in current else NOT_FOUND
+        for header_id in header_ids
+    }
+
+
+def bulk_cancel(db_session, header_ids):
+    """Скасовує активні замовлення; повертає {id: результат}"""
+    header_ids = sorted(set(header_ids))
+    targets = {status: OrderStatus.CANCELLED for status in ACTIVE_STATUSES}
+    current, previous = _transition(db_session, header_ids, targets)
+    return _report(header_ids, current, previous)
+
+
+def bulk_advance(db_session, header_ids):
+    """Переводить кожне замовлення в наступний статус (NEXT_STATUS)"""
+    header_ids = sorted(set(header_ids))
+    current, previous = _transition(db_session, header_ids, NEXT_STATUS)
+    return _report(header_ids, current, previous)
+
+
+def bulk_delete(db_session, header_ids):
+    """Видаляє завершені замовлення разом з рядками; активні пропускає"""
+    header_ids = sorted(set(header_ids))
+    current = _locked_statuses(db_session, header_ids)
+    deletable = [header_id for header_id, status in current.items() if status in FINAL_STATUSES]
+    deleted = []
+    if deletable:
+        final_headers = select(OrderHeader.id).where(
+            OrderHeader.id.in_(deletable), OrderHeader.status.in_(FINAL_STATUSES)
+        )
+        db_session.execute(
+            delete(Order).where(Order.header_id.in_(final_headers))
+            .execution_options(synchronize_session=False)
+        )
+        deleted = sorted(db_session.scalars(
+            delete(OrderHeader).where(OrderHeader.id.in_(deletable), OrderHeader.status.in_(FINAL_STATUSES))
+            .returning(OrderHeader.id)
+            .execution_options(synchronize_session=False)
+        ).all())
+        order_events.publish_many(db_session, "order_deleted", [(header_id, {}) for header_id in deleted])
+    return _report(header_ids, current, set(deleted))
+
+
+def set_priority(db_session, header_id, priority):
+    """Змінює пріоритет замовлення на кухні; повертає True, якщо замовлення є"""
+    changed = db_session.execute(
+        update(OrderHeader)
+        .where(OrderHeader.id == header_id)
+        .values(priority=priority)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if changed:
+        order_events.publish(db_session, "order_priority", header_id, priority=priority)
+    return bool(changed)
@@ -0,0 +1,79 @@
+"""Кеш готових сторінок для анонімних відвідувачів (Flask-Caching).
+
+Кешуються лише GET-запити без авторизації та без flash-повідомлень,
+що очікують показу: такі сторінки однакові для всіх, а сторінку з
+повідомленням все одно потрібно відрендерити один раз. Ключ — шлях,
+рядок запиту та мова. Кеш очищується, коли адмінка змінює меню або
+налаштування сайту.
+
+Бекенд обирається змінною PAGE_CACHE_BACKEND:
+simple (у пам'яті процесу), filesystem (спільний для воркерів каталог),
+redis (локальний Redis або сумісний сервер) або null (вимкнено).
+"""
+import os
+import tempfile
+
+from flask import request, session
+from flask_caching import Cache
+from flask_login import current_user
+
+BACKENDS = {
+    "simple": "SimpleCache",
+    "filesystem": "FileSystemCache",
+    "redis": "RedisCache",
+    "null": "NullCache",
+}
+
+cache = Cache()
+
+
+def init_page_cache(app):
+    backend = os.getenv("PAGE_CACHE_BACKEND", "simple").lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Невідомий бекенд кешу сторінок: {backend}")
+
+    config = {
+        "CACHE_TYPE": BACKENDS[backend],
+        "CACHE_DEFAULT_TIMEOUT": int(os.getenv("PAGE_CACHE_TIMEOUT", "300")),
+        "CACHE_THRESHOLD": int(os.getenv("PAGE_CACHE_THRESHOLD", "500")),
+        "CACHE_KEY_PREFIX": "page:",
+    }
+    if backend == "filesystem":
+        config["CACHE_DIR"] = os.getenv(
+            "PAGE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "restaurant_page_cache")
+        )
+    elif backend == "redis":
+        config["CACHE_REDIS_URL"] = os.getenv("PAGE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+    cache.init_app(app, config=config)
+
+
+def _bypass():
+    return (request.method != "GET"
+            or current_user.is_authenticated
+            or bool(session.get("_flashes")))
+
+
+def _lang():
+    return session.get("language", "uk")
+
+
+def _page_key(*args, **kwargs):
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.args.items(multi=True)))
+    return f"{request.path}?{query}|{_lang()}"
+
+
+def _error_key(error, *args, **kwargs):
+    # Сторінка помилки не залежить від шляху, тому не плодимо ключі для кожного 404
+    return f"error:{getattr(error, 'code', 500)}|{_lang()}"
+
+
+def _is_success(response):
+    return getattr(response, "status_code", 200) == 200
+
+
+cached_page = cache.cached(unless=_bypass, make_cache_key=_page_key, response_filter=_is_success)
+cached_error_page = cache.cached(unless=_bypass, make_cache_key=_error_key)
+
+
+def clear_page_cache():
+    cache.clear()
@@ -0,0 +1,40 @@
+"""Keyset-пагінація за парою (created_at, id) у порядку спадання."""
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(created_at, row_id):
+    return f"{created_at.isoformat()}_{row_id}"
+
+
+def decode_cursor(cursor):
+    """Повертає (created_at, id) або None для відсутнього/пошкодженого курсору"""
+    if not cursor:
+        return None
+    try:
+        created_at, row_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError:
+        return None
+
+
+def keyset_before(created_column, id_column, cursor):
+    """Умова WHERE для рядків, що йдуть після курсору при сортуванні created_at DESC, id DESC"""
+    created_at, row_id = cursor
+    return or_(
+        created_column < created_at,
+        and_(created_column == created_at, id_column < row_id),
+    )
+
+
+def fetch_page(query, created_column, id_column, cursor, per_page):
+    """Виконує запит сторінки; повертає (рядки, курсор наступної сторінки або None)"""
+    if cursor:
+        query = query.filter(keyset_before(created_column, id_column, cursor))
+    rows = query.order_by(created_column.desc(), id_column.desc()).limit(per_page + 1).all()
+    if len(rows) <= per_page:
+        return rows, None
+    rows = rows[:per_page]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
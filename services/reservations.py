@@ -0,0 +1,328 @@
+"""Бронювання столиків: вільні слоти та пошук конфліктів без сканування.
+
+Для кожного дня в пам'яті тримається DayIndex: столики, відсортовані за
+кількістю місць, і для кожного столика — відсортовані інтервали його
+бронювань. Оскільки інтервали одного столика не перетинаються,
+конфлікт перевіряється одним bisect (O(log n)), а столики на N гостей
+знаходяться bisect за місцями. День завантажується з бази одним
+запитом і далі оновлюється після коміту бронювання чи скасування.
+
+Індекс інших воркерів живе не довше RESERVATION_INDEX_TTL секунд, тому
+перед вставкою столик блокується до коміту, а його вільність ще раз
+перевіряється в базі запитом за індексом (table_id, time_start). Два
+паралельні бронювання одного столика виконуються по черзі, і друге
+бачить перше.
+"""
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session as OrmSession
+
+from models import DiningTable, Reservation, User
+from services.lru import TTLCache
+from settings import Session
+
+RESERVATION_SLOT_MINUTES = int(os.getenv("RESERVATION_SLOT_MINUTES", "30"))
+RESERVATION_DURATION_MINUTES = int(os.getenv("RESERVATION_DURATION_MINUTES", "120"))
+RESERVATION_OPEN = time.fromisoformat(os.getenv("RESERVATION_OPEN", "11:00"))
+# До закриття бронювання має завершитись
+RESERVATION_CLOSE = time.fromisoformat(os.getenv("RESERVATION_CLOSE", "23:00"))
+RESERVATION_DAYS_AHEAD = int(os.getenv("RESERVATION_DAYS_AHEAD", "30"))
+RESERVATION_INDEX_TTL = float(os.getenv("RESERVATION_INDEX_TTL", "30"))
+
+ACTIVE_STATUSES = ("pending", "confirmed")
+NO_FREE_TABLES = "Немає вільних столиків на цей час"
+
+
+class ReservationError(ValueError):
+    """Бронювання неможливе (час, кількість гостей або немає столиків)"""
+
+
+@dataclass(frozen=True, slots=True)
+class TableInfo:
+    id: int
+    name: str
+    seats: int
+
+
+@dataclass(frozen=True, slots=True)
+class Slot:
+    start: datetime
+    end: datetime
+    free_tables: int
+
+
+class TableSchedule:
+    """Відсортовані інтервали бронювань одного столика, що не перетинаються"""
+
+    __slots__ = ("starts", "ends", "ids")
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.ids = []
+
+    def conflicts(self, start, end):
+        # Перетин можливий лише з останнім інтервалом, що почався до end
+        position = bisect_left(self.starts, end)
+        return position > 0 and self.ends[position - 1] > start
+
+    def add(self, start, end, reservation_id):
+        position = bisect_right(self.starts, start)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.ids.insert(position, reservation_id)
+
+    def remove(self, start, reservation_id):
+        position = bisect_left(self.starts, start)
+        while position < len(self.ids) and self.starts[position] == start:
+            if self.ids[position] == reservation_id:
+                del self.starts[position], self.ends[position], self.ids[position]
+                return True
+            position += 1
+        return False
+
+
+class DayIndex:
+    """Зайнятість усіх столиків за один день"""
+
+    def __init__(self, day, tables, reservations=()):
+        self.day = day
+        self.tables = sorted(tables, key=lambda table: (table.seats, table.id))
+        self.seats = [table.seats for table in self.tables]
+        self.schedules = {table.id: TableSchedule() for table in self.tables}
+        self.starts_by_id = {}
+        for reservation_id, table_id, start, end in reservations:
+            self.add(reservation_id, table_id, start, end)
+
+    @property
+    def max_seats(self):
+        return self.seats[-1] if self.seats else 0
+
+    def free_tables(self, start, end, guests):
+        """Вільні столики, де вистачає місць, — найменші першими"""
+        first = bisect_left(self.seats, guests)
+        return [table for table in self.tables[first:]
+                if not self.schedules[table.id].conflicts(start, end)]
+
+    def slots(self, guests, not_before=None):
+        """Слоти дня, на які ще можна посадити guests гостей"""
+        result = []
+        for start in slot_starts(self.day):
+            if not_before is not None and start < not_before:
+                continue
+            end = start + timedelta(minutes=RESERVATION_DURATION_MINUTES)
+            free = len(self.free_tables(start, end, guests))
+            if free:
+                result.append(Slot(start=start, end=end, free_tables=free))
+        return result
+
+    def add(self, reservation_id, table_id, start, end):
+        schedule = self.schedules.get(table_id)
+        # Столик міг стати неактивним — його бронювання не враховуються
+        if schedule is not None and reservation_id not in self.starts_by_id:
+            schedule.add(start, end, reservation_id)
+            self.starts_by_id[reservation_id] = (table_id, start)
+
+    def remove(self, reservation_id):
+        entry = self.starts_by_id.pop(reservation_id, None)
+        if entry is not None:
+            table_id, start = entry
+            self.schedules[table_id].remove(start, reservation_id)
+
+
+def slot_starts(day):
+    start = datetime.combine(day, RESERVATION_OPEN)
+    last = datetime.combine(day, RESERVATION_CLOSE) - timedelta(minutes=RESERVATION_DURATION_MINUTES)
+    step = timedelta(minutes=RESERVATION_SLOT_MINUTES)
+    while start <= last:
+        yield start
+        start += step
+
+
+def _day_bounds(day):
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+def _load_day(day):
+    day_start, day_end = _day_bounds(day)
+    with Session() as db_session:
+        tables = [TableInfo(id=row.id, name=row.name, seats=row.seats) for row in db_session.execute(
+            select(DiningTable.id, DiningTable.name, DiningTable.seats).where(DiningTable.active.is_(True))
+        )]
+        reservations = db_session.execute(
+            select(Reservation.id, Reservation.table_id, Reservation.time_start, Reservation.time_end)
+            .where(Reservation.time_start >= day_start, Reservation.time_start < day_end,
+                   Reservation.table_id.is_not(None), Reservation.time_end.is_not(None),
+                   Reservation.status.in_(ACTIVE_STATUSES))
+        ).all()
+    return DayIndex(day, tables, reservations)
+
+
+class ReservationIndex:
+    """Кеш DayIndex по днях з інкрементальним оновленням"""
+
+    def __init__(self, ttl=RESERVATION_INDEX_TTL):
+        self._days = TTLCache(max_size=64, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def day(self, day):
+        return self._days.get_or_load(day, _load_day)
+
+    def free_tables(self, start, end, guests):
+        with self._lock:
+            return self.day(start.date()).free_tables(start, end, guests)
+
+    def slots(self, day, guests, not_before=None):
+        with self._lock:
+            return self.day(day).slots(guests, not_before)
+
+    def max_seats(self, day):
+        return self.day(day).max_seats
+
+    def added(self, reservation_id, table_id, start, end):
+        day_index = self._days.get(start.date())
+        if day_index is not None:
+            with self._lock:
+                day_index.add(reservation_id, table_id, start, end)
+
+    def removed(self, reservation_id, start):
+        day_index = self._days.get(start.date())
+        if day_index is not None:
+            with self._lock:
+                day_index.remove(reservation_id)
+
+    def invalidate(self, day=None):
+        if day is None:
+            self._days.clear()
+        else:
+            self._days.evict(day)
+
+
+reservation_index = ReservationIndex()
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _apply_index_changes(db_session):
+    for change in db_session.info.pop("reservation_index", ()):
+        change()
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_index_changes(db_session):
+    db_session.info.pop("reservation_index", None)
+
+
+def _on_commit(db_session, change):
+    db_session.info.setdefault("reservation_index", []).append(change)
+
+
+def _lock_table(db_session, table_id):
+    """Блокує столик до кінця транзакції; False — столик уже вимкнули.
+
+    UPDATE без зміни значень бере блокування рядка в Postgres і
+    блокування запису в SQLite (перший запис транзакції чекає
+    busy_timeout), тож паралельне бронювання чекає нашого коміту.
+    """
+    return bool(db_session.execute(
+        update(DiningTable)
+        .where(DiningTable.id == table_id, DiningTable.active.is_(True))
+        .values(active=DiningTable.active)
+        .execution_options(synchronize_session=False)
+    ).rowcount)
+
+
+def _table_is_free(db_session, table_id, start, end):
+    conflict = db_session.execute(
+        select(Reservation.id)
+        .where(Reservation.table_id == table_id,
+               Reservation.status.in_(ACTIVE_STATUSES),
+               # Бронювання не довше доби: нижня межа звужує діапазон індексу
+               Reservation.time_start > start - timedelta(days=1),
+               Reservation.time_start < end,
+               Reservation.time_end > start)
+        .limit(1)
+    ).first()
+    return conflict is None
+
+
+def validate_request(start, guests, now=None):
+    now = now or datetime.now()
+    if guests < 1:
+        raise ReservationError("Вкажіть кількість гостей")
+    if start < now:
+        raise ReservationError("Не можна забронювати час у минулому")
+    if start.date() > now.date() + timedelta(days=RESERVATION_DAYS_AHEAD):
+        raise ReservationError("Бронювання відкрите лише на найближчі дні")
+    if start not in set(slot_starts(start.date())):
+        raise ReservationError("Оберіть один із запропонованих слотів")
+    if guests > reservation_index.max_seats(start.date()):
+        raise ReservationError("Немає столиків на таку кількість гостей")
+
+
+def book(db_session, user_id, start, guests, notes=None):
+    """Бронює найменший вільний столик, де вистачає місць (без коміту)"""
+    validate_request(start, guests)
+    end = start + timedelta(minutes=RESERVATION_DURATION_MINUTES)
+    for table in reservation_index.free_tables(start, end, guests):
+        if not _lock_table(db_session, table.id) or not _table_is_free(db_session, table.id, start, end):
+            # Столик зайняв інший воркер: його індекс дня застарів
+            reservation_index.invalidate(start.date())
+            continue
+        reservation = Reservation(user_id=user_id, table_id=table.id, time_start=start, time_end=end,
+                                  guests=guests, notes=notes or None, status="confirmed")
+        db_session.add(reservation)
+        db_session.flush()
+        _on_commit(db_session, lambda reservation_id=reservation.id, table_id=table.id:
+                   reservation_index.added(reservation_id, table_id, start, end))
+        return reservation
+    raise ReservationError(NO_FREE_TABLES)
+
+
+def cancel(db_session, reservation_id, user_id=None):
+    """Скасовує активне бронювання (лише власне, якщо задано user_id)"""
+    conditions = [Reservation.id == reservation_id, Reservation.status.in_(ACTIVE_STATUSES)]
+    if user_id is not None:
+        conditions.append(Reservation.user_id == user_id)
+    start = db_session.execute(select(Reservation.time_start).where(*conditions)).scalar()
+    if start is None:
+        return False
+    db_session.execute(
+        update(Reservation).where(*conditions).values(status="cancelled")
+        .execution_options(synchronize_session=False)
+    )
+    _on_commit(db_session, lambda: reservation_index.removed(reservation_id, start))
+    return True
+
+
+def upcoming_for_user(db_session, user_id, now=None):
+    return db_session.execute(
+        select(Reservation, DiningTable.name)
+        .outerjoin(DiningTable, DiningTable.id == Reservation.table_id)
+        .where(Reservation.user_id == user_id, Reservation.time_start >= (now or datetime.now()),
+               Reservation.status.in_(ACTIVE_STATUSES))
+        .order_by(Reservation.time_start)
+    ).all()
+
+
+def day_reservations(db_session, day):
+    day_start, day_end = _day_bounds(day)
+    return db_session.execute(
+        select(Reservation, DiningTable.name, User.username)
+        .join(User, User.id == Reservation.user_id)
+        .outerjoin(DiningTable, DiningTable.id == Reservation.table_id)
+        .where(Reservation.time_start >= day_start, Reservation.time_start < day_end)
+        .order_by(Reservation.time_start, Reservation.id)
+    ).all()
+
+
+def parse_day(value, default=None):
+    try:
+        return date.fromisoformat(value) if value else default
+    except ValueError:
+        return default
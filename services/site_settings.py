@@ -0,0 +1,84 @@
+"""Кеш налаштувань сайту (фонові зображення та логотипи).
+
+Налаштування змінюються рідко, а читаються на кожній сторінці, тому
+тримаємо їх у пам'яті процесу і перечитуємо з бази лише після
+інвалідації з адмінки.
+"""
+import os
+from dataclasses import asdict, dataclass
+
+from models import SiteSettings
+from services.versioned import VersionedCache
+from settings import Session
+
+IMAGE_SETTINGS = (
+    'main_background_image',
+    'menu_background_image',
+    'admin_panel_background_image',
+    'cart_background_image',
+    'order_history_background_image',
+    'logo_image',
+    'mini_logo_image',
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SiteImages:
+    """Незмінний набір зображень сайту"""
+    main_background_image: str | None = None
+    menu_background_image: str | None = None
+    admin_panel_background_image: str | None = None
+    cart_background_image: str | None = None
+    order_history_background_image: str | None = None
+    logo_image: str | None = None
+    mini_logo_image: str | None = None
+
+    def get(self, name, default=None):
+        value = getattr(self, name, None)
+        return default if value is None else value
+
+    def as_dict(self):
+        return asdict(self)
+
+
+def _load_site_images():
+    with Session() as db_session:
+        rows = db_session.query(SiteSettings.setting_name, SiteSettings.setting_value).filter(
+            SiteSettings.setting_name.in_(IMAGE_SETTINGS)
+        ).all()
+    return SiteImages(**{name: value for name, value in rows})
+
+
+site_settings_cache = VersionedCache(_load_site_images, max_age=int(os.getenv("SETTINGS_CACHE_TTL", "300")))
+
+
+def get_site_images() -> SiteImages:
+    return site_settings_cache.get()
+
+
+def save_site_images(db_session, values):
+    """Зберігає змінені налаштування одним SELECT та повертає кількість змін.
+
+    Коміт робить викликач; після коміту потрібно викликати
+    site_settings_cache.invalidate().
+    """
+    existing = {
+        setting.setting_name: setting
+        for setting in db_session.query(SiteSettings).filter(
+            SiteSettings.setting_name.in_(list(values))
+        )
+    }
+    changed = 0
+    for setting_name, setting_value in values.items():
+        setting = existing.get(setting_name)
+        if setting is None:
+            db_session.add(SiteSettings(
+                setting_name=setting_name,
+                setting_value=setting_value,
+                description=f"Налаштування {setting_name}"
+            ))
+            changed += 1
+        elif setting.setting_value != setting_value:
+            setting.setting_value = setting_value
+            changed += 1
+    return changed
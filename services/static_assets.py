@@ -0,0 +1,151 @@
+"""Статичні файли з хешем вмісту в імені та попередньо стиснутими копіями.
+
+build() копіює файли зі static/ у STATIC_BUILD_DIR під іменами на
+кшталт css/style.1a2b3c4d5e.css, поруч кладе .gz (і .br, якщо
+встановлено brotli) для текстових форматів та пише manifest.json.
+Якщо маніфест є, url_for('static', ...) повертає ім'я з хешем, а такі
+файли віддаються з Cache-Control immutable на рік: повторний
+відвідувач не робить за статикою жодного запиту. Після зміни статики
+збірку треба повторити — старі URL лишаються робочими до наступного
+очищення каталогу.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(ROOT, "static")
+STATIC_BUILD_DIR = os.getenv("STATIC_BUILD_DIR", os.path.join(ROOT, "build", "static"))
+MANIFEST_NAME = "manifest.json"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".txt", ".html", ".map", ".ico"}
+# Завантажені зображення вже мають хеш в імені (services.images)
+SKIP_DIRS = {"uploads"}
+MIN_COMPRESS_BYTES = 256
+# Порядок переваги кодувань
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _fingerprinted(name, data):
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    stem, extension = os.path.splitext(name)
+    return f"{stem}.{digest}{extension}"
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as handle:
+        handle.write(data)
+    os.replace(temporary, path)
+
+
+def _compressed_variants(data):
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    return variants
+
+
+def build(source=STATIC_DIR, target=STATIC_BUILD_DIR, clean=False):
+    """Збирає статику та повертає маніфест {вихідне ім'я: ім'я з хешем}"""
+    if clean and os.path.isdir(target):
+        shutil.rmtree(target)
+    manifest = {}
+    for directory, subdirectories, files in os.walk(source):
+        subdirectories[:] = sorted(
+            name for name in subdirectories
+            if not (directory == source and name in SKIP_DIRS)
+        )
+        for file_name in sorted(files):
+            path = os.path.join(directory, file_name)
+            name = os.path.relpath(path, source).replace(os.sep, "/")
+            with open(path, "rb") as handle:
+                data = handle.read()
+            hashed = _fingerprinted(name, data)
+            output = os.path.join(target, hashed)
+            if not os.path.exists(output):
+                _write(output, data)
+                if os.path.splitext(name)[1].lower() in COMPRESSIBLE and len(data) >= MIN_COMPRESS_BYTES:
+                    for suffix, compressed in _compressed_variants(data).items():
+                        # Стиснута копія, що не менша за оригінал, лише зайвий трафік
+                        if len(compressed) < len(data):
+                            _write(output + suffix, compressed)
+            manifest[name] = hashed
+    _write(os.path.join(target, MANIFEST_NAME),
+           json.dumps(manifest, indent=2, sort_keys=True).encode())
+    return manifest
+
+
+def load_manifest(target=STATIC_BUILD_DIR):
+    try:
+        with open(os.path.join(target, MANIFEST_NAME), encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+class StaticAssets:
+    """Підміна імен у url_for('static') та віддача зібраних файлів"""
+
+    def __init__(self, manifest, build_dir=STATIC_BUILD_DIR):
+        self.manifest = manifest
+        self.build_dir = build_dir
+        self.hashed = frozenset(manifest.values())
+
+    def url_defaults(self, endpoint, values):
+        if endpoint == "static":
+            filename = values.get("filename")
+            values["filename"] = self.manifest.get(filename, filename)
+
+    def serve(self, filename, fallback):
+        if filename not in self.hashed:
+            response = fallback(filename=filename)
+            if filename.split("/", 1)[0] in SKIP_DIRS:
+                response.headers["Cache-Control"] = IMMUTABLE
+            return response
+
+        response = None
+        for encoding, suffix in ENCODINGS:
+            if request.accept_encodings[encoding] and os.path.isfile(os.path.join(self.build_dir, filename + suffix)):
+                response = send_from_directory(self.build_dir, filename + suffix, max_age=None,
+                                               mimetype=_mimetype(filename))
+                response.headers["Content-Encoding"] = encoding
+                break
+        if response is None:
+            response = send_from_directory(self.build_dir, filename, max_age=None)
+        response.headers["Cache-Control"] = IMMUTABLE
+        response.vary.add("Accept-Encoding")
+        return response
+
+
+def _mimetype(filename):
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+def init_static_assets(app):
+    """Підключає зібрану статику (STATIC_ASSETS=0 вимикає).
+
+    Без маніфесту url_for не змінюється, але завантажені зображення
+    все одно кешуються як незмінні.
+    """
+    if not app.config.get("STATIC_ASSETS", True):
+        return None
+    assets = StaticAssets(load_manifest())
+    fallback = app.view_functions["static"]
+    if assets.manifest:
+        app.url_defaults(assets.url_defaults)
+    app.view_functions["static"] = lambda filename: assets.serve(filename, fallback)
+    app.extensions["static_assets"] = assets
+    return assets
@@ -0,0 +1,68 @@
+"""Кеш користувачів для Flask-Login user_loader.
+
+Замість ORM-об'єкта User у кеші лежить легкий від'єднаний запис
+з полями, які потрібні шаблонам. evict_user скидає запис лише в
+поточному воркері, тому доступ до адмінки перевіряється в базі
+(has_admin_rights): зміна прав діє одразу в усіх воркерах.
+"""
+import os
+
+from flask_login import UserMixin
+
+from models import User
+from services.lru import TTLCache
+from settings import Session
+
+
+class CachedUser(UserMixin):
+    """Від'єднаний знімок користувача для current_user"""
+    __slots__ = ('id', 'username', 'email', 'is_admin')
+
+    def __init__(self, id, username, email, is_admin):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.is_admin = bool(is_admin)
+
+    def __repr__(self) -> str:
+        return f"CachedUser: {self.id}, {self.username}"
+
+
+# Відсутніх користувачів теж кешуємо (None), тому після реєстрації
+# запис потрібно вилучити, якщо id було використано повторно.
+user_cache = TTLCache(
+    max_size=int(os.getenv("USER_CACHE_SIZE", "1024")),
+    ttl=int(os.getenv("USER_CACHE_TTL", "60")),
+)
+
+
+def _load_user(user_id):
+    with Session() as db_session:
+        row = db_session.query(User.id, User.username, User.email, User.is_admin).filter(
+            User.id == user_id
+        ).first()
+    return CachedUser(*row) if row else None
+
+
+def get_cached_user(user_id):
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+    return user_cache.get_or_load(user_id, _load_user)
+
+
+def evict_user(user_id):
+    user_cache.evict(int(user_id))
+
+
+def has_admin_rights(user_id):
+    """Читає is_admin з бази; видалений користувач прав не має"""
+    user_id = int(user_id)
+    with Session() as db_session:
+        is_admin = bool(db_session.query(User.is_admin).filter(User.id == user_id).scalar())
+    cached = user_cache.get(user_id)
+    if cached is not None and cached.is_admin != is_admin:
+        # Права змінили в іншому воркері: оновлюємо й запис для шаблонів
+        evict_user(user_id)
+    return is_admin
@@ -0,0 +1,47 @@
+"""Версіонований кеш значення, яке рідко змінюється і часто читається."""
+import threading
+import time
+
+
+class VersionedCache:
+    """Тримає результат loader() у пам'яті процесу до наступної інвалідації.
+
+    invalidate() лише збільшує версію, перебудова відбувається ліниво
+    при наступному get(). max_age (секунди) обмежує застарілість для
+    інших воркерів, які не бачать інвалідації цього процесу.
+    """
+
+    def __init__(self, loader, max_age=None):
+        self.loader = loader
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._version = 0
+        self._loaded_version = -1
+        self._loaded_at = 0.0
+        self._value = None
+
+    @property
+    def version(self):
+        return self._version
+
+    def _is_fresh(self):
+        if self._value is None or self._loaded_version != self._version:
+            return False
+        if self.max_age and time.monotonic() - self._loaded_at > self.max_age:
+            return False
+        return True
+
+    def get(self):
+        if self._is_fresh():
+            return self._value
+        with self._lock:
+            if not self._is_fresh():
+                version = self._version
+                self._value = self.loader()
+                self._loaded_version = version
+                self._loaded_at = time.monotonic()
+            return self._value
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
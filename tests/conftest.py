@@ -0,0 +1,32 @@
+"""Тести працюють з тимчасовою базою SQLite.
+
+Налаштування читаються під час імпорту, тому змінні оточення задаються
+до імпорту застосунку — так само, як у benchmarks/load.py.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix="restaurant-tests-")
+os.environ.update(
+    DATABASE_NAME=os.path.join(WORKDIR, "test"),
+    DB_PROFILE="sqlite",
+    METRICS_DB=os.path.join(WORKDIR, "metrics.db"),
+    PAGE_CACHE_BACKEND="simple",
+    APP_WARM_UP="0",
+    TEMPLATE_CACHE_DIR="",
+)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app import create_app
+    from migrate_db import upgrade
+
+    upgrade()
+    return create_app({"TESTING": True, "WTF_CSRF_ENABLED": False})
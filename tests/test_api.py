@@ -0,0 +1,16 @@
+from services.catalog import invalidate_catalog
+
+
+def test_menu_revalidates_by_etag_only(app):
+    client = app.test_client()
+    response = client.get("/api/v1/menu?lang=en")
+    assert response.status_code == 200
+    assert "Last-Modified" not in response.headers
+    etag = response.headers["ETag"]
+
+    # Перебудова знімка без змін меню не змінює ETag
+    invalidate_catalog()
+    assert client.get("/api/v1/menu?lang=en", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/v1/menu?lang=uk", headers={"If-None-Match": etag}).status_code == 200
+    assert client.get("/api/v1/menu?lang=en",
+                      headers={"If-Modified-Since": "Wed, 01 Jan 2031 00:00:00 GMT"}).status_code == 200
@@ -0,0 +1,52 @@
+from sqlalchemy import delete, select, update
+
+from models import Menu, Order, User
+from services import cart as cart_service
+from services import orders as order_service
+from services.catalog import get_catalog, invalidate_catalog
+from settings import Session
+
+
+def _setup(names):
+    with Session() as db_session:
+        user = User(username="cart_customer", email="cart_customer@example.com", hash_password="-")
+        items = [Menu(name=name, price=100, active=True) for name in names]
+        db_session.add_all([user, *items])
+        db_session.commit()
+        invalidate_catalog()
+        return user.id, [item.id for item in items]
+
+
+def test_add_item_uses_current_price_and_active_flag(app):
+    user_id, (dish, retired) = _setup(["Ціна з бази", "Знята страва"])
+    assert get_catalog().get(dish).price == 100
+    with Session() as db_session:
+        # Адмінка іншого воркера змінила меню: знімок каталогу тут застарів
+        db_session.execute(update(Menu).where(Menu.id == dish).values(price=150))
+        db_session.execute(update(Menu).where(Menu.id == retired).values(active=False))
+        db_session.commit()
+
+        assert cart_service.add_item(db_session, user_id, dish, 2)
+        assert cart_service.add_item(db_session, user_id, dish, 1)
+        assert not cart_service.add_item(db_session, user_id, retired, 1)
+        db_session.commit()
+
+        summary = cart_service.load_cart(db_session, user_id)
+    assert [(line.menu_id, line.quantity, line.total_price) for line in summary.lines] == [(dish, 3, 450)]
+
+
+def test_checkout_drops_lines_of_deleted_dishes(app):
+    with Session() as db_session:
+        user_id = db_session.scalar(select(User.id).where(User.username == "cart_customer"))
+        deleted = Menu(name="Видалена страва", price=300, active=True)
+        db_session.add(deleted)
+        db_session.flush()
+        assert cart_service.add_item(db_session, user_id, deleted.id, 1)
+        db_session.execute(delete(Menu).where(Menu.id == deleted.id))
+        db_session.commit()
+
+        header = order_service.checkout(db_session, user_id)
+        db_session.commit()
+        assert header.total_price == 450
+        assert header.items_count == 3
+        assert db_session.scalar(select(Order.id).where(Order.menu_id == deleted.id)) is None
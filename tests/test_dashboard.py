@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta
+
+from models import OrderHeader, OrderStatus, User
+from services import dashboard
+from services.archive import archive_closed_orders
+from settings import Session
+
+
+def test_totals_survive_archiving(app):
+    long_ago = datetime.now() - timedelta(days=365)
+    with Session() as db_session:
+        user = User(username="dashboard_customer", email="dashboard_customer@example.com", hash_password="-")
+        db_session.add(user)
+        db_session.flush()
+        db_session.add_all([OrderHeader(user_id=user.id, status=status, total_price=100, created_at=long_ago)
+                            for status in (OrderStatus.COMPLETED, OrderStatus.COMPLETED, OrderStatus.CANCELLED)])
+        db_session.commit()
+
+    dashboard._stats_cache.clear()
+    before = dashboard.get_dashboard_stats()
+    assert archive_closed_orders(cutoff=datetime.now() - timedelta(days=90)) >= 3
+
+    # Запис панелі живе кілька секунд; агрегат архіву має оновитись без очікування
+    dashboard._stats_cache.clear()
+    after = dashboard.get_dashboard_stats()
+    assert after.total_orders == before.total_orders
+    assert after.status_counts == before.status_counts
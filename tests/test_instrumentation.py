@@ -0,0 +1,25 @@
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from services import instrumentation
+from settings import get_engine
+
+
+def test_failed_statement_does_not_skew_later_timings(app):
+    metrics = instrumentation.RequestMetrics(endpoint="test", method="GET", path="/")
+    token = instrumentation._current.set(metrics)
+    try:
+        with get_engine().connect() as connection:
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM missing_table"))
+            time.sleep(0.2)
+            connection.execute(text("SELECT 1"))
+            assert not connection.info.get("query_started")
+    finally:
+        instrumentation._current.reset(token)
+
+    assert metrics.query_count == 1
+    assert metrics.query_ms < 100
@@ -0,0 +1,66 @@
+import threading
+
+from sqlalchemy import select
+
+from models import OrderEvent, OrderHeader, OrderStatus, User
+from services import orders as order_service
+from settings import Session
+
+
+def _create_order(status):
+    with Session() as db_session:
+        user = db_session.scalar(select(User).where(User.username == "orders_customer"))
+        if user is None:
+            user = User(username="orders_customer", email="orders_customer@example.com", hash_password="-")
+            db_session.add(user)
+            db_session.flush()
+        header = OrderHeader(user_id=user.id, status=status)
+        db_session.add(header)
+        db_session.commit()
+        return header.id
+
+
+def _status_events(header_id):
+    with Session() as db_session:
+        return [event.payload for event in db_session.scalars(
+            select(OrderEvent).where(OrderEvent.header_id == header_id, OrderEvent.kind == "order_status")
+            .order_by(OrderEvent.id)
+        )]
+
+
+def test_bulk_cancel_waits_for_concurrent_transition(app):
+    header_id = _create_order(OrderStatus.CONFIRMED)
+    results = {}
+
+    def cancel():
+        with Session() as db_session:
+            results["report"] = order_service.bulk_cancel(db_session, [header_id])
+            db_session.commit()
+
+    with Session() as kitchen_session:
+        order_service.bulk_advance(kitchen_session, [header_id])
+        other_admin = threading.Thread(target=cancel)
+        other_admin.start()
+        other_admin.join(0.3)
+        # Скасування чекає на блокування, поки кухня не закомітить свій перехід
+        assert other_admin.is_alive()
+        kitchen_session.commit()
+    other_admin.join()
+
+    assert results["report"] == {header_id: order_service.CHANGED}
+    assert _status_events(header_id) == [
+        {"id": header_id, "status": "PREPARING", "previous": "CONFIRMED"},
+        {"id": header_id, "status": "CANCELLED", "previous": "PREPARING"},
+    ]
+
+
+def test_transition_reports_only_changed_orders(app):
+    active = _create_order(OrderStatus.READY)
+    finished = _create_order(OrderStatus.COMPLETED)
+    with Session() as db_session:
+        report = order_service.bulk_advance(db_session, [active, finished, 10 ** 9])
+        db_session.commit()
+        assert db_session.get(OrderHeader, active).status is OrderStatus.DELIVERING
+    assert report == {active: order_service.CHANGED, finished: order_service.NOT_ALLOWED,
+                      10 ** 9: order_service.NOT_FOUND}
+    assert _status_events(finished) == []
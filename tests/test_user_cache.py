@@ -0,0 +1,55 @@
+from werkzeug.security import generate_password_hash
+
+from models import User
+from services.lru import TTLCache
+from services.user_cache import get_cached_user, user_cache
+from settings import Session
+
+PASSWORD = "TestAdmin123!"
+
+
+def _create_admin(username):
+    with Session() as db_session:
+        user = User(username=username, email=f"{username}@example.com",
+                    hash_password=generate_password_hash(PASSWORD), is_admin=True)
+        db_session.add(user)
+        db_session.commit()
+        return user.id
+
+
+def _login(app, username):
+    client = app.test_client()
+    client.post("/auth/login", data={"username": username, "password": PASSWORD})
+    return client
+
+
+def test_demoted_admin_loses_access_on_every_worker(app):
+    user_id = _create_admin("demoted_admin")
+    client = _login(app, "demoted_admin")
+    assert client.get("/admin/dashboard").status_code == 200
+    assert get_cached_user(user_id).is_admin
+
+    # Права забирає інший воркер: його evict_user не чіпає кеш цього процесу
+    other_worker_cache = TTLCache()
+    with Session() as db_session:
+        db_session.get(User, user_id).is_admin = False
+        db_session.commit()
+    other_worker_cache.evict(user_id)
+    assert user_cache.get(user_id).is_admin
+
+    response = client.get("/admin/dashboard")
+    assert response.status_code == 302
+    assert "/admin" not in response.headers["Location"]
+    assert not get_cached_user(user_id).is_admin
+
+
+def test_deleted_admin_loses_access(app):
+    user_id = _create_admin("deleted_admin")
+    client = _login(app, "deleted_admin")
+    assert client.get("/admin/dashboard").status_code == 200
+
+    with Session() as db_session:
+        db_session.delete(db_session.get(User, user_id))
+        db_session.commit()
+
+    assert client.get("/admin/dashboard").status_code == 302
@@ -236,6 +236,121 @@ translations = {
         'Суши-бар - IZI. Всі права захищено.': 'Суши-бар - IZI. Всі права захищено.',
         'Політика конфіденційності': 'Політика конфіденційності',
         'Умови використання': 'Умови використання',
+        
+        # Пошук по меню
+        'Пошук страв...': 'Пошук страв...',
+        'Знайти': 'Знайти',
+        'Попередня': 'Попередня',
+        'Наступна': 'Наступна',
+        'Знайдено страв': 'Знайдено страв',
+        
+        # Фільтри замовлень
+        'Усі статуси': 'Усі статуси',
+        'Від': 'Від',
+        'До': 'До',
+        'Фільтрувати': 'Фільтрувати',
+        'Скинути': 'Скинути',
+        'На початок': 'На початок',
+        
+        # Замовлення
+        'Страви': 'Страви',
+        
+        # Панель управління
+        'Сьогодні': 'Сьогодні',
+        'Замовлень': 'Замовлень',
+        'Виручка': 'Виручка',
+        'Замовлення за статусами': 'Замовлення за статусами',
+        
+        # Заголовки адмінпанелі
+        'Адмінпанель - Головна': 'Адмінпанель - Головна',
+        'Адмінпанель - Додати страву': 'Адмінпанель - Додати страву',
+        'Адмінпанель - Замовлення': 'Адмінпанель - Замовлення',
+        'Адмінпанель - Користувачі': 'Адмінпанель - Користувачі',
+        'Адмінпанель - Меню': 'Адмінпанель - Меню',
+        'Адмінпанель - Налаштування': 'Адмінпанель - Налаштування',
+        'Адмінпанель - Редагувати страву': 'Адмінпанель - Редагувати страву',
+        
+        # Продуктивність
+        'Продуктивність': 'Продуктивність',
+        'Адмінпанель - Продуктивність': 'Адмінпанель - Продуктивність',
+        'Останні запити кожного маршруту в цьому процесі. Повільні запити пишуться в лог, поріг': 'Останні запити кожного маршруту в цьому процесі. Повільні запити пишуться в лог, поріг',
+        'мс': 'мс',
+        'Маршрут': 'Маршрут',
+        'Запитів': 'Запитів',
+        'Середній, мс': 'Середній, мс',
+        'Макс, мс': 'Макс, мс',
+        'SQL-запитів': 'SQL-запитів',
+        'Час у БД, мс': 'Час у БД, мс',
+        'Рядків': 'Рядків',
+        'Помилки': 'Помилки',
+        'Ще немає даних': 'Ще немає даних',
+        
+        # Зображення
+        'Завантажити зображення': 'Завантажити зображення',
+        'Файл має пріоритет над шляхом; буде створено зменшені копії та WebP': 'Файл має пріоритет над шляхом; буде створено зменшені копії та WebP',
+        'Файл зображення завеликий': 'Файл зображення завеликий',
+        'Підтримуються лише JPEG, PNG та WebP': 'Підтримуються лише JPEG, PNG та WebP',
+        'Файл не є коректним зображенням': 'Файл не є коректним зображенням',
+        
+        # Черга кухні
+        'Адмінпанель - Кухня': 'Адмінпанель - Кухня',
+        'Черга кухні': 'Черга кухні',
+        'Почати готувати': 'Почати готувати',
+        'Готово': 'Готово',
+        'Пріоритет': 'Пріоритет',
+        'Підвищити пріоритет': 'Підвищити пріоритет',
+        'Знизити пріоритет': 'Знизити пріоритет',
+        'Черга порожня': 'Черга порожня',
+        'Пропущено замовлень': 'Пропущено замовлень',
+        
+        # Масові операції із замовленнями
+        'Наступний статус': 'Наступний статус',
+        'Скасувати вибрані замовлення?': 'Скасувати вибрані замовлення?',
+        'Скасувати вибрані': 'Скасувати вибрані',
+        'Видалити вибрані завершені замовлення?': 'Видалити вибрані завершені замовлення?',
+        'Видалити вибрані': 'Видалити вибрані',
+        'Вибрати всі': 'Вибрати всі',
+        'Не вибрано замовлень або дію': 'Не вибрано замовлень або дію',
+        'Змінено замовлень': 'Змінено замовлень',
+        'змінено': 'змінено',
+        'недопустимо для поточного статусу': 'недопустимо для поточного статусу',
+        'не знайдено': 'не знайдено',
+        
+        # Бронювання столиків
+        'Бронювання': 'Бронювання',
+        'Адмінпанель - Бронювання': 'Адмінпанель - Бронювання',
+        'Бронювання столика': 'Бронювання столика',
+        'Бронювань ще немає': 'Бронювань ще немає',
+        'Вимкнути': 'Вимкнути',
+        'Увімкнути': 'Увімкнути',
+        'Вільних столиків': 'Вільних столиків',
+        'Додати столик': 'Додати столик',
+        'Забронювати': 'Забронювати',
+        'Кількість гостей': 'Кількість гостей',
+        'Мої бронювання': 'Мої бронювання',
+        'Місць': 'Місць',
+        'Назва': 'Назва',
+        'Немає вільних столиків на цей день': 'Немає вільних столиків на цей день',
+        'Побажання': 'Побажання',
+        'Показати': 'Показати',
+        'Показати вільний час': 'Показати вільний час',
+        'Скасувати бронювання?': 'Скасувати бронювання?',
+        'Столик': 'Столик',
+        'Столики': 'Столики',
+        'Час': 'Час',
+        'Столик заброньовано': 'Столик заброньовано',
+        'Бронювання скасовано': 'Бронювання скасовано',
+        'Бронювання не знайдено': 'Бронювання не знайдено',
+        'Вкажіть назву та кількість місць': 'Вкажіть назву та кількість місць',
+        'Столик з такою назвою вже існує': 'Столик з такою назвою вже існує',
+        'Столик додано': 'Столик додано',
+        'Столик не знайдено': 'Столик не знайдено',
+        'Вкажіть кількість гостей': 'Вкажіть кількість гостей',
+        'Не можна забронювати час у минулому': 'Не можна забронювати час у минулому',
+        'Бронювання відкрите лише на найближчі дні': 'Бронювання відкрите лише на найближчі дні',
+        'Оберіть один із запропонованих слотів': 'Оберіть один із запропонованих слотів',
+        'Немає столиків на таку кількість гостей': 'Немає столиків на таку кількість гостей',
+        'Немає вільних столиків на цей час': 'Немає вільних столиків на цей час',
     },
     'en': {
         # Common phrases
@@ -473,6 +588,121 @@ translations = {
         'Суши-бар - IZI. Всі права захищено.': 'Sushi Bar - EASY. All rights reserved.',
         'Політика конфіденційності': 'Privacy Policy',
         'Умови використання': 'Terms of Use',
+        
+        # Пошук по меню
+        'Пошук страв...': 'Search dishes...',
+        'Знайти': 'Search',
+        'Попередня': 'Previous',
+        'Наступна': 'Next',
+        'Знайдено страв': 'Dishes found',
+        
+        # Фільтри замовлень
+        'Усі статуси': 'All statuses',
+        'Від': 'From',
+        'До': 'To',
+        'Фільтрувати': 'Filter',
+        'Скинути': 'Reset',
+        'На початок': 'First page',
+        
+        # Замовлення
+        'Страви': 'Dishes',
+        
+        # Панель управління
+        'Сьогодні': 'Today',
+        'Замовлень': 'Orders',
+        'Виручка': 'Revenue',
+        'Замовлення за статусами': 'Orders by status',
+        
+        # Заголовки адмінпанелі
+        'Адмінпанель - Головна': 'Admin panel - Home',
+        'Адмінпанель - Додати страву': 'Admin panel - Add dish',
+        'Адмінпанель - Замовлення': 'Admin panel - Orders',
+        'Адмінпанель - Користувачі': 'Admin panel - Users',
+        'Адмінпанель - Меню': 'Admin panel - Menu',
+        'Адмінпанель - Налаштування': 'Admin panel - Settings',
+        'Адмінпанель - Редагувати страву': 'Admin panel - Edit dish',
+        
+        # Продуктивність
+        'Продуктивність': 'Performance',
+        'Адмінпанель - Продуктивність': 'Admin panel - Performance',
+        'Останні запити кожного маршруту в цьому процесі. Повільні запити пишуться в лог, поріг': 'Recent requests per route in this process. Slow requests are logged, threshold',
+        'мс': 'ms',
+        'Маршрут': 'Route',
+        'Запитів': 'Requests',
+        'Середній, мс': 'Average, ms',
+        'Макс, мс': 'Max, ms',
+        'SQL-запитів': 'SQL queries',
+        'Час у БД, мс': 'DB time, ms',
+        'Рядків': 'Rows',
+        'Помилки': 'Errors',
+        'Ще немає даних': 'No data yet',
+        
+        # Зображення
+        'Завантажити зображення': 'Upload image',
+        'Файл має пріоритет над шляхом; буде створено зменшені копії та WebP': 'The file takes precedence over the path; resized copies and WebP will be generated',
+        'Файл зображення завеликий': 'The image file is too large',
+        'Підтримуються лише JPEG, PNG та WebP': 'Only JPEG, PNG and WebP are supported',
+        'Файл не є коректним зображенням': 'The file is not a valid image',
+        
+        # Черга кухні
+        'Адмінпанель - Кухня': 'Admin panel - Kitchen',
+        'Черга кухні': 'Kitchen queue',
+        'Почати готувати': 'Start cooking',
+        'Готово': 'Ready',
+        'Пріоритет': 'Priority',
+        'Підвищити пріоритет': 'Raise priority',
+        'Знизити пріоритет': 'Lower priority',
+        'Черга порожня': 'The queue is empty',
+        'Пропущено замовлень': 'Orders skipped',
+        
+        # Масові операції із замовленнями
+        'Наступний статус': 'Next status',
+        'Скасувати вибрані замовлення?': 'Cancel the selected orders?',
+        'Скасувати вибрані': 'Cancel selected',
+        'Видалити вибрані завершені замовлення?': 'Delete the selected finished orders?',
+        'Видалити вибрані': 'Delete selected',
+        'Вибрати всі': 'Select all',
+        'Не вибрано замовлень або дію': 'No orders or action selected',
+        'Змінено замовлень': 'Orders changed',
+        'змінено': 'changed',
+        'недопустимо для поточного статусу': 'not allowed for the current status',
+        'не знайдено': 'not found',
+        
+        # Бронювання столиків
+        'Бронювання': 'Reservations',
+        'Адмінпанель - Бронювання': 'Admin Panel - Reservations',
+        'Бронювання столика': 'Table reservation',
+        'Бронювань ще немає': 'No reservations yet',
+        'Вимкнути': 'Disable',
+        'Увімкнути': 'Enable',
+        'Вільних столиків': 'Free tables',
+        'Додати столик': 'Add table',
+        'Забронювати': 'Book',
+        'Кількість гостей': 'Guests',
+        'Мої бронювання': 'My reservations',
+        'Місць': 'Seats',
+        'Назва': 'Name',
+        'Немає вільних столиків на цей день': 'No free tables on this day',
+        'Побажання': 'Notes',
+        'Показати': 'Show',
+        'Показати вільний час': 'Show available times',
+        'Скасувати бронювання?': 'Cancel the reservation?',
+        'Столик': 'Table',
+        'Столики': 'Tables',
+        'Час': 'Time',
+        'Столик заброньовано': 'Table booked',
+        'Бронювання скасовано': 'Reservation cancelled',
+        'Бронювання не знайдено': 'Reservation not found',
+        'Вкажіть назву та кількість місць': 'Enter a name and the number of seats',
+        'Столик з такою назвою вже існує': 'A table with this name already exists',
+        'Столик додано': 'Table added',
+        'Столик не знайдено': 'Table not found',
+        'Вкажіть кількість гостей': 'Enter the number of guests',
+        'Не можна забронювати час у минулому': 'You cannot book a time in the past',
+        'Бронювання відкрите лише на найближчі дні': 'Booking is open only for the coming days',
+        'Оберіть один із запропонованих слотів': 'Choose one of the offered time slots',
+        'Немає столиків на таку кількість гостей': 'There are no tables for that many guests',
+        'Немає вільних столиків на цей час': 'No free tables at this time',
     }
 }
 
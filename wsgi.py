@@ -0,0 +1,8 @@
+"""Точка входу для gunicorn: gunicorn wsgi:app
+
+Воркер прогріває шаблони та кеші ще до першого запиту (APP_WARM_UP=0 вимикає).
+"""
+from app import create_app
+from settings import env_bool
+
+app = create_app({"WARM_UP": env_bool("APP_WARM_UP", True)})